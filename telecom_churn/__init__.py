@@ -0,0 +1,5 @@
+"""电信客户流失分析 - 可复用的数据处理与统计组件。"""
+
+from .preprocess import (BINARY_COLUMNS, BINARY_MAPPING, CONTRACT_FEATURES,
+                         DEMOGRAPHIC_FEATURES, INTERNET_ADDONS, NUMERIC_FEATURES,
+                         SERVICE_FEATURES, preprocess)
@@ -0,0 +1,5 @@
+"""python -m telecom_churn：运行多维度分析报告（见 telecom_churn.report）。"""
+
+from .report import main
+
+main()
@@ -0,0 +1,80 @@
+# ==============================
+# 单次遍历的多维度流失聚合引擎
+# ==============================
+#
+# 原脚本对每个维度分别执行 df.groupby(feature)['Churn'].agg(['mean', 'count'])，
+# 同一维度在不同章节中还会被重复分组。这里把所有维度转换为整数编码，
+# 按维度加上偏移量后与流失标记拼成一个键矩阵，只调用一次 np.bincount，
+# 即可得到所有维度每个取值的客户数与流失数。各章节的图表和打印都从这张表读取。
+
+import numpy as np
+import pandas as pd
+
+from .preprocess import (CONTRACT_FEATURES, DEMOGRAPHIC_FEATURES, INTERNET_ADDONS,
+                         SERVICE_FEATURES)
+
+ANALYSIS_DIMENSIONS = (DEMOGRAPHIC_FEATURES + SERVICE_FEATURES + CONTRACT_FEATURES
+                       + ['PaperlessBilling', 'tenure'])
+
+
+def _codes(col):
+    """返回 (整数编码, 取值)；category 列直接使用其编码，缺失值编码为 -1。"""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.cat.codes.to_numpy(), col.cat.categories
+    return pd.factorize(col, sort=True)
+
+
+def aggregate_dimensions(df, dimensions=ANALYSIS_DIMENSIONS, target='Churn'):
+    """一次遍历计算多个维度的分组客户数与流失数。
+
+    返回以 (dimension, value) 为索引、列为 [count, churn] 的 DataFrame。
+    多张结果表可以直接相加（见 merge_aggregates），适用于分块或分区计算。
+    """
+    n = len(df)
+    y = df[target].to_numpy().astype(np.int64)
+    keys = np.empty((n, len(dimensions)), dtype=np.int64)
+    index = []
+    offset = 0
+    for j, dim in enumerate(dimensions):
+        codes, uniques = _codes(df[dim])
+        keys[:, j] = np.where(codes >= 0, codes + offset, -1)
+        index.extend((dim, value) for value in uniques)
+        offset += len(uniques)
+    # 缺失值统一放到末尾的哨兵槽位
+    keys[keys < 0] = offset
+    # 键 = 维度取值槽位 * 2 + 流失标记，一次 bincount 得到每个槽位的 [留存, 流失] 计数
+    keys <<= 1
+    keys |= y[:, None]
+    counts = np.bincount(keys.ravel(), minlength=2 * (offset + 1))[:2 * offset].reshape(-1, 2)
+
+    table = pd.DataFrame({'count': counts.sum(axis=1), 'churn': counts[:, 1]},
+                         index=pd.MultiIndex.from_tuples(index, names=['dimension', 'value']))
+    return table[table['count'] > 0]
+
+
+def merge_aggregates(left, right):
+    """合并两张聚合表（缺失的分组视为0）。"""
+    if left is None:
+        return right
+    # 不同维度的取值类型不同（整数/字符串），合并时不对整个索引排序
+    return pd.concat([left, right]).groupby(level=['dimension', 'value'], sort=False).sum()
+
+
+def churn_table(table, feature):
+    """从聚合表取出单个维度，结构与 df.groupby(feature)['Churn'].agg(['mean', 'count']) 相同。
+
+    附加服务中的 'No internet service' 并入 'No'，MultipleLines 去掉 'No phone service'，
+    与服务分析章节的口径一致。
+    """
+    stats = table.xs(feature, level='dimension')[['count', 'churn']]
+    # 单个维度内取值类型一致，恢复为具体类型的索引并排序（与 groupby 的输出顺序一致）
+    stats.index = pd.Index(stats.index.tolist())
+    stats = stats.sort_index()
+    if feature in INTERNET_ADDONS:
+        stats = stats.rename(index={'No internet service': 'No'}).groupby(level=0).sum()
+    elif feature == 'MultipleLines':
+        stats = stats.drop('No phone service', errors='ignore')
+    out = pd.DataFrame({'mean': stats['churn'] / stats['count'],
+                        'count': stats['count'].astype(np.int64)})
+    out.index.name = feature
+    return out
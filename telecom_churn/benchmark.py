@@ -0,0 +1,218 @@
+# ==============================
+# 基准测试 - 各分析阶段在不同数据规模下的耗时与内存
+# ==============================
+#
+# 对每个数据规模先生成（或复用）合成数据，再在独立子进程中按主脚本的顺序执行
+# 与各章节相同的计算：加载（read_validated：读取 + 数据质量校验 + 预处理）、列存储、
+# 多维度聚合、置信区间、留存曲线、细分立方体、分位数草图、财务指标、相关系数、
+# 特征重要性、风险模型训练与评分、各图表逐张渲染、分析摘要、数据导出与客户查询索引。
+# 图表输入由各阶段的结果组装（与主脚本各章节写入 ctx.chart_data 的内容相同），
+# 不另外遍历数据。主脚本新增或修改章节时应同步修改这里，否则基准测试无法发现回归。
+# 每个阶段记录耗时和阶段内峰值内存（RSS），结果写成 JSON 文件，便于在不同版本之间对比。
+# 每个规模使用独立子进程，峰值内存互不影响；某个规模失败（例如内存不足）
+# 只记录失败状态，不影响其它规模。
+#
+# 用法:
+#     python -m telecom_churn.benchmark --sizes 10000 1000000 10000000 --output benchmark_results.json
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from .instrument import RunRecorder
+
+DEFAULT_SIZES = [10_000, 1_000_000, 10_000_000, 100_000_000]
+DEFAULT_DATA_DIR = 'benchmark_data'
+DEFAULT_OUTPUT = 'benchmark_results.json'
+
+
+def run_sections(path, work_dir):
+    """在当前进程中依次执行与主脚本各章节相同的计算，返回阶段记录列表。"""
+    from .aggregate import ANALYSIS_DIMENSIONS, aggregate_dimensions, churn_table
+    from .charts import CHART_NAMES, render_chart
+    from .colstore import ensure_column_store
+    from .correlation import CorrelationAccumulator
+    from .cube import CUBE_FILENAME, SegmentCube
+    from .density import class_histogram, class_histogram2d
+    from .export import export_frame
+    from .importance import feature_importance
+    from .intervals import with_intervals
+    from .lookup import build_customer_index
+    from .preprocess import DEMOGRAPHIC_FEATURES, NUMERIC_FEATURES, SERVICE_FEATURES
+    from .quantiles import ChurnBinner
+    from .report import CHARGE_BINS, DEFAULT_SUMMARY_FORMATS, FINANCIAL_DENSITY_THRESHOLD
+    from .scoring import RISK_BANDS, ChurnRiskModel, risk_band, roc_auc
+    from .summary import build_summary, write_summary
+    from .survival import RETENTION_MONTHS, RetentionCurves
+    from .validate import read_validated
+
+    timer = RunRecorder()
+    chart_data = {}
+    # 第1-2章：校验在读取时逐列向量化执行，问题行写入隔离文件；校验与预处理无法与解析分开计时
+    with timer.stage('load') as record:
+        df = read_validated(path, quarantine_path=os.path.join(work_dir, 'quarantine.csv'))
+        record['rows'] = df.attrs['validation']['rows']
+        n = len(df)
+    with timer.stage('column_store', n):
+        columns = ensure_column_store(path, df, cache_dir=os.path.join(work_dir, '.cache'))
+    with timer.stage('aggregate', n):
+        agg = aggregate_dimensions(df, ANALYSIS_DIMENSIONS)
+    # 第4-6章的流失率表
+    with timer.stage('intervals', n):
+        rate_tables = with_intervals({f: churn_table(agg, f) for f in ANALYSIS_DIMENSIONS
+                                      if f != 'tenure'}, method='bootstrap', seed=42)
+        chart_data['demographic_analysis'] = {
+            'tables': {f: rate_tables[f] for f in DEMOGRAPHIC_FEATURES}}
+        chart_data['service_analysis'] = {'tables': {f: rate_tables[f] for f in SERVICE_FEATURES}}
+        chart_data['contract_payment_analysis'] = {
+            'contract': rate_tables['Contract'].sort_values('mean'),
+            'payment': rate_tables['PaymentMethod'].sort_values('mean')}
+    # 第3章
+    with timer.stage('survival', n):
+        retention = RetentionCurves.from_frame(df)
+        retention.retention(RETENTION_MONTHS)
+        churn_count = int(df['Churn'].sum())
+        chart_data['churn_overview'] = {'churn_counts': [n - churn_count, churn_count],
+                                        'retention': retention.curve()}
+        chart_data['retention_curves'] = retention.chart_data()
+    with timer.stage('segment_cube', n):
+        cube = SegmentCube.from_frame(df)
+    # 第7章
+    with timer.stage('quantiles', n):
+        charge_bins = ChurnBinner.from_columns(columns)
+    with timer.stage('financial', n):
+        churn = columns['Churn']
+        chart = {'monthly_hist': class_histogram(columns['MonthlyCharges'], churn, bins=30),
+                 'total_hist': class_histogram(columns['TotalCharges'], churn, bins=30),
+                 'monthly_churn': charge_bins.churn_curve('MonthlyCharges')}
+        if n > FINANCIAL_DENSITY_THRESHOLD:
+            chart['density'] = class_histogram2d(columns['tenure'], columns['TotalCharges'], churn)
+        else:
+            chart['scatter'] = (np.asarray(columns['tenure']),
+                                np.asarray(columns['TotalCharges']), np.asarray(churn))
+        chart_data['financial_analysis'] = chart
+        for col in ('MonthlyCharges', 'TotalCharges', 'tenure'):
+            charge_bins.churn_by_bins(col, bins=CHARGE_BINS)
+    # 第8章
+    with timer.stage('correlation', n):
+        correlation = CorrelationAccumulator(NUMERIC_FEATURES + ['Churn']).update(df)
+        chart_data['correlation_analysis'] = {'correlation_matrix': correlation.matrix()}
+    with timer.stage('importance', n):
+        chart_data['feature_importance'] = {'ranking': feature_importance(agg)}
+    # 第9章摘要中的风险评分：与主脚本相同在全量数据上训练（分块 IRLS，内存不随行数增长）
+    with timer.stage('scoring', n):
+        model = ChurnRiskModel.fit(df)
+        churn_probability = model.score_frame(df)
+        flags = df['Churn'].to_numpy()
+        risk = {'auc': float(roc_auc(df['Churn'], churn_probability)),
+                'threshold': RISK_BANDS[-2][0],
+                'active_high_risk': int(((risk_band(churn_probability) == 'high')
+                                         & (flags == 0)).sum())}
+    # 逐张渲染，每张图是一个阶段，得到各自的耗时与阶段内峰值内存（主脚本用进程池并行渲染）
+    images_dir = os.path.join(work_dir, 'images')
+    os.makedirs(images_dir, exist_ok=True)
+    for name in CHART_NAMES:
+        if name in chart_data:
+            with timer.stage(f'figure:{name}'):
+                render_chart(name, chart_data[name], images_dir)
+    with timer.stage('summary', n):
+        summary = build_summary(agg, cube, retention, risk)
+        write_summary(summary, os.path.join(work_dir, 'analysis_summary'),
+                      DEFAULT_SUMMARY_FORMATS)
+    # 第10章
+    with timer.stage('export', n):
+        export_frame(df, os.path.join(work_dir, 'telecom_churn_processed'))
+        model.save(os.path.join(work_dir, 'churn_risk_model.json'))
+        cube.save(os.path.join(work_dir, CUBE_FILENAME))
+    with timer.stage('customer_index', n):
+        build_customer_index(df, os.path.join(work_dir, 'customer_index'), model)
+    return timer.records
+
+
+def ensure_dataset(rows, data_dir, seed=0):
+    """返回指定规模的合成数据路径，不存在时生成并记录生成耗时。"""
+    from .synthetic import write_synthetic_csv
+
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f'synthetic_{rows}.csv')
+    if os.path.exists(path):
+        return path, None
+    start = time.perf_counter()
+    write_synthetic_csv(path, rows, seed=seed)
+    return path, time.perf_counter() - start
+
+
+def run_size(rows, data_dir, timeout=None):
+    """在独立子进程中运行一个规模的基准测试，返回结果字典。"""
+    path, generate_seconds = ensure_dataset(rows, data_dir)
+    result = {'rows': rows, 'data': path, 'generate_seconds': generate_seconds}
+    cmd = [sys.executable, '-m', 'telecom_churn.benchmark', '--worker', path]
+    try:
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                              universal_newlines=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        result.update(status='timeout', stages=[])
+        return result
+    if proc.returncode != 0:
+        # 被系统因内存不足终止时返回码为负（SIGKILL）
+        result.update(status='failed', returncode=proc.returncode,
+                      error=proc.stderr.strip().splitlines()[-1:] or None, stages=[])
+        return result
+    result.update(status='ok', stages=json.loads(proc.stdout.strip().splitlines()[-1]))
+    return result
+
+
+def environment():
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'cpu_count': os.cpu_count(), 'numpy': np.__version__, 'pandas': pd.__version__,
+            'timestamp': pd.Timestamp.now().isoformat()}
+
+
+def print_results(results):
+    for result in results:
+        print(f"\n📏 {result['rows']:,} 行: {result['status']}")
+        for record in result['stages']:
+            rss = record['peak_rss_mb']
+            rss_text = f"{rss:,.0f} MB" if rss is not None else '-'
+            delta = record.get('peak_delta_mb')
+            delta_text = f"（+{delta:,.0f} MB）" if delta is not None else ''
+            print(f"  {record['stage']:<36} {record['wall_seconds']:>9.3f} 秒  "
+                  f"峰值内存 {rss_text}{delta_text}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="电信客户流失分析 - 基准测试")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="数据规模（行数）")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="合成数据目录（已存在的文件会被复用）")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="JSON 结果文件")
+    parser.add_argument('--timeout', type=float, default=None, help="单个规模的超时秒数")
+    parser.add_argument('--worker', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        # 子进程模式：执行各阶段，最后一行输出 JSON
+        with tempfile.TemporaryDirectory() as work_dir:
+            print(json.dumps(run_sections(args.worker, work_dir)))
+        return
+
+    results = []
+    for rows in args.sizes:
+        print(f"⏱️ 正在测试 {rows:,} 行...")
+        results.append(run_size(rows, args.data_dir, args.timeout))
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment(), 'results': results}, f,
+                  ensure_ascii=False, indent=2)
+    print_results(results)
+    print(f"\n✅ 基准测试结果已保存为: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
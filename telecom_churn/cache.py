@@ -0,0 +1,113 @@
+# ==============================
+# 预处理结果的列式缓存
+# ==============================
+#
+# 清洗后的数据以 Feather (Arrow IPC, 不压缩) 格式缓存，文件名包含
+# 原始CSV内容的哈希和预处理版本号。再次运行时直接内存映射读取缓存，
+# 跳过CSV解析与清洗；原始CSV内容或预处理逻辑变化时自动重建。
+# 缓存未命中时原始数据先经过数据质量校验（validate），问题行写入隔离文件，
+# 各规则的违规数随缓存一起保存在 Arrow 元数据中。
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+
+from .validate import read_validated
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow 为可选依赖，缺失时退化为直接读取CSV
+    pa = None
+    feather = None
+
+# 预处理逻辑（schema / preprocess）有改动时递增，使旧缓存失效
+PREPROCESS_VERSION = 2
+DEFAULT_CACHE_DIR = '.cache'
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+def source_hash(path):
+    """按块计算原始文件内容的哈希。"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path(path, cache_dir=DEFAULT_CACHE_DIR, digest=None):
+    """缓存文件路径: <文件名>.<内容哈希>.v<预处理版本>.feather"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    digest = digest or source_hash(path)
+    return os.path.join(cache_dir, f'{stem}.{digest}.v{PREPROCESS_VERSION}.feather')
+
+
+def _remove_stale(path, cache_dir, keep):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    keep_stem = os.path.splitext(os.path.abspath(keep))[0]
+    for old in glob.glob(os.path.join(cache_dir, f'{stem}.*')):
+        if os.path.splitext(os.path.abspath(old))[0] == keep_stem:
+            continue
+        # 旧的 .feather 缓存以及与之同名的派生目录（如 .columns 列存储）
+        if os.path.isdir(old):
+            shutil.rmtree(old)
+        else:
+            os.remove(old)
+
+
+def write_cache(df, target):
+    """写入缓存；填充前的 TotalCharges 缺失数量与校验结果存入 Arrow 元数据。"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b'total_charges_missing'] = str(df.attrs.get('total_charges_missing', 0)).encode()
+    if 'validation' in df.attrs:
+        metadata[b'validation'] = json.dumps(df.attrs['validation']).encode()
+    table = table.replace_schema_metadata(metadata)
+    tmp = target + '.tmp'
+    feather.write_feather(table, tmp, compression='uncompressed')
+    os.replace(tmp, target)
+
+
+def read_cache(target):
+    """内存映射读取缓存文件。
+
+    to_pandas 按列拆分块（split_blocks）并在转换时释放已转换的 Arrow 列（self_destruct），
+    数值列尽量零拷贝引用映射的页，不再同时持有 Arrow 表与 pandas 两份完整副本。
+    """
+    table = feather.read_table(target, memory_map=True)
+    metadata = table.schema.metadata or {}
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+    df.attrs['total_charges_missing'] = int(metadata.get(b'total_charges_missing', b'0'))
+    if b'validation' in metadata:
+        df.attrs['validation'] = json.loads(metadata[b'validation'])
+    return df
+
+
+def load_processed(path, cache_dir=DEFAULT_CACHE_DIR, refresh=False, quarantine_path=None):
+    """返回清洗后的数据：命中缓存则直接读取，否则解析并校验CSV后写入缓存。
+
+    返回 (df, cache_hit)。校验未通过的行写入 quarantine_path（命中缓存时沿用上次的隔离文件），
+    各规则的违规数记录在 df.attrs['validation'] 中。原始CSV的内容哈希记录在 df.attrs['source_digest'] 中，
+    供派生的缓存（如列存储）复用，避免重复读取整个文件计算哈希。
+    """
+    if feather is None:
+        print("⚠️ 未安装 pyarrow，跳过列式缓存")
+        return read_validated(path, quarantine_path=quarantine_path), False
+
+    digest = source_hash(path)
+    target = cache_path(path, cache_dir, digest)
+    if not refresh and os.path.exists(target):
+        df = read_cache(target)
+        df.attrs['source_digest'] = digest
+        return df, True
+
+    df = read_validated(path, quarantine_path=quarantine_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    write_cache(df, target)
+    _remove_stale(path, cache_dir, target)
+    df.attrs['source_digest'] = digest
+    return df, False
@@ -0,0 +1,363 @@
+# ==============================
+# 图表渲染 - 非交互式后端 + 进程池并行
+# ==============================
+#
+# 每张图表由一个渲染函数负责，输入是分析阶段已经算好的聚合结果（小表/小数组），
+# 不再需要完整的 DataFrame。各图在进程池中并发渲染并保存为300 dpi的PNG，
+# 总耗时约等于最慢的一张图。
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')  # 非交互式后端，批处理/无显示环境下不会阻塞
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from .parallel import pool_context  # noqa: E402
+
+DEFAULT_DPI = 300
+CHART_NAMES = ['churn_overview', 'demographic_analysis', 'service_analysis',
+               'contract_payment_analysis', 'financial_analysis', 'correlation_analysis',
+               'retention_curves', 'feature_importance']
+
+
+def setup_style():
+    """设置中文字体与专业图表样式（每个渲染进程各自调用一次）。"""
+    import seaborn as sns
+
+    plt.rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans']
+    plt.rcParams['axes.unicode_minus'] = False
+    try:
+        plt.style.use('seaborn-darkgrid')
+    except OSError:  # matplotlib >= 3.6 中样式改名
+        plt.style.use('seaborn-v0_8-darkgrid')
+    sns.set_palette("husl")
+    plt.rcParams['figure.figsize'] = (12, 8)
+
+
+# ==============================
+# 各图表渲染函数
+# ==============================
+
+def render_churn_overview(data):
+    """总体流失分析：饼图、数量柱状图、在网时长留存曲线（Kaplan-Meier）。"""
+    churn_counts = data['churn_counts']
+    retention = data['retention']
+    fig, axes = plt.subplots(1, 3, figsize=(18, 6))
+
+    # 子图1: 流失分布饼图
+    colors = ['#2E86AB', '#A23B72']
+    axes[0].pie(churn_counts, labels=['Stayed', 'Churned'], autopct='%1.1f%%',
+                colors=colors, startangle=90, explode=(0.05, 0))
+    axes[0].set_title('Customer Churn Distribution', fontsize=14, fontweight='bold')
+
+    # 子图2: 流失客户数量柱状图
+    axes[1].bar(range(len(churn_counts)), churn_counts, color=colors)
+    axes[1].set_title('Customer Churn Count Comparison', fontsize=14, fontweight='bold')
+    axes[1].set_xlabel('Churn Status')
+    axes[1].set_ylabel('Number of Customers')
+    axes[1].set_xticks(range(len(churn_counts)))
+    axes[1].set_xticklabels(['Stayed', 'Churned'])
+    for i, v in enumerate(churn_counts):
+        axes[1].text(i, v + 50, str(v), ha='center', fontweight='bold')
+
+    # 子图3: 在网时长留存曲线（考虑删失），阴影为95%置信区间
+    _retention_step(axes[2], retention, '#A23B72', band=True)
+    axes[2].set_title('Tenure Retention Curve (Kaplan-Meier)', fontsize=14, fontweight='bold')
+    axes[2].set_xlabel('Tenure (Months)')
+    axes[2].set_ylabel('Retention (%)')
+    axes[2].grid(True, alpha=0.3)
+    return fig
+
+
+def _retention_step(ax, curve, color, label=None, band=False):
+    """按在网月数绘制阶梯形留存曲线。"""
+    ax.step(curve.index, curve['survival'] * 100, where='post', linewidth=2.5,
+            color=color, label=label)
+    if band:
+        ax.fill_between(curve.index, curve['ci_low'] * 100, curve['ci_high'] * 100,
+                        step='post', alpha=0.3, color=color)
+
+
+def render_demographic_analysis(data):
+    """人口统计特征：各特征客户数与流失率双轴图 + 流失率热力图。"""
+    import seaborn as sns
+
+    tables = data['tables']
+    fig, axes = plt.subplots(2, 3, figsize=(18, 12))
+    axes = axes.flatten()
+    titles = {'gender': 'Gender', 'SeniorCitizen': 'Senior Citizen',
+              'Partner': 'Partner', 'Dependents': 'Dependents'}
+    colors_demo = ['#4B8BBE', '#FFD43B', '#306998', '#646464']
+
+    for idx, (feature, churn_by_feature) in enumerate(tables.items()):
+        feature_counts = churn_by_feature['count']
+        labels = ['Female', 'Male'] if feature == 'gender' else ['No', 'Yes']
+
+        axes[idx].bar(range(len(feature_counts)), feature_counts.values,
+                      color=colors_demo[idx], alpha=0.7, label='Customer Count')
+        axes[idx].set_xticks(range(len(feature_counts)))
+        axes[idx].set_xticklabels(labels)
+        axes[idx].set_ylabel('Customer Count')
+        axes[idx].set_title(f'{titles[feature]} Distribution', fontweight='bold')
+
+        # 第二y轴显示流失率
+        ax2 = axes[idx].twinx()
+        ax2.plot(range(len(churn_by_feature)), churn_by_feature['mean'] * 100,
+                 color='#A23B72', marker='o', linewidth=2, label='Churn Rate')
+        ax2.set_ylabel('Churn Rate (%)', color='#A23B72')
+        ax2.tick_params(axis='y', labelcolor='#A23B72')
+
+        lines1, labels1 = axes[idx].get_legend_handles_labels()
+        lines2, labels2 = ax2.get_legend_handles_labels()
+        axes[idx].legend(lines1 + lines2, labels1 + labels2, loc='upper right')
+
+    # 人口统计特征对流失率的影响（热力图）
+    demographic_df = pd.DataFrame([t['mean'].values for t in tables.values()],
+                                  index=[titles[f] for f in tables],
+                                  columns=['No', 'Yes'])
+    axes[4].axis('off')
+    ax_heatmap = fig.add_subplot(2, 3, 5)
+    sns.heatmap(demographic_df * 100, annot=True, fmt='.1f', cmap='YlOrRd',
+                cbar_kws={'label': 'Churn Rate (%)'}, ax=ax_heatmap)
+    ax_heatmap.set_title('Demographic Churn Rate Heatmap', fontweight='bold')
+    axes[5].axis('off')
+    return fig
+
+
+def render_service_analysis(data):
+    """服务使用特征：每项服务的流失率柱状图。"""
+    tables = data['tables']
+    fig, axes = plt.subplots(3, 3, figsize=(18, 15))
+    axes = axes.flatten()
+
+    for idx, (feature, churn_by_service) in enumerate(tables.items()):
+        if idx >= len(axes):
+            break
+        labels = churn_by_service.index.tolist()
+        bars = axes[idx].bar(range(len(churn_by_service)), churn_by_service['mean'] * 100,
+                             color=['#4B8BBE', '#FFD43B', '#306998'][:len(churn_by_service)])
+        axes[idx].set_xticks(range(len(churn_by_service)))
+        axes[idx].set_xticklabels(labels, rotation=45)
+        axes[idx].set_ylabel('Churn Rate (%)')
+        axes[idx].set_title(f'{feature}\nChurn Rate Analysis', fontweight='bold')
+
+        for bar in bars:
+            height = bar.get_height()
+            axes[idx].text(bar.get_x() + bar.get_width() / 2., height + 0.5,
+                           f'{height:.1f}%', ha='center', va='bottom', fontsize=9)
+    return fig
+
+
+def _annotated_rate_bars(ax, table, colors, title, rotation=0, ha='center'):
+    bars = ax.bar(range(len(table)), table['mean'] * 100, color=colors)
+    ax.set_xticks(range(len(table)))
+    ax.set_xticklabels(table.index, rotation=rotation, ha=ha)
+    ax.set_ylabel('Churn Rate (%)')
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    for bar, (_, row) in zip(bars, table.iterrows()):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width() / 2., height + 0.5,
+                f'{height:.1f}%\n({int(row["count"]):,})', ha='center', va='bottom')
+
+
+def render_contract_payment_analysis(data):
+    """合同类型与支付方式的流失率柱状图（附客户数）。"""
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    _annotated_rate_bars(axes[0], data['contract'], ['#4B8BBE', '#FFD43B', '#A23B72'],
+                         'Contract Type vs Churn Rate')
+    _annotated_rate_bars(axes[1], data['payment'],
+                         ['#4B8BBE', '#FFD43B', '#A23B72', '#306998'],
+                         'Payment Method vs Churn Rate', rotation=15, ha='right')
+    return fig
+
+
+def _class_histogram(ax, edges, counts, xlabel, title):
+    """按预先分好的区间计数绘制留存/流失直方图。"""
+    centers = (edges[:-1] + edges[1:]) / 2
+    ax.hist([centers, centers], bins=edges, weights=counts, alpha=0.7,
+            label=['Stayed', 'Churned'], color=['#4B8BBE', '#A23B72'])
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel('Customer Count')
+    ax.set_title(title, fontweight='bold')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+
+
+def render_financial_analysis(data):
+    """财务指标：月费/总费用分布、月费区间流失率、在网时长与总费用关系。"""
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+
+    edges, counts = data['monthly_hist']
+    _class_histogram(axes[0, 0], edges, counts, 'Monthly Charges ($)',
+                     'Monthly Charges Distribution - Stayed vs Churned')
+    edges, counts = data['total_hist']
+    _class_histogram(axes[0, 1], edges, counts, 'Total Charges ($)',
+                     'Total Charges Distribution - Stayed vs Churned')
+
+    monthly_churn = data['monthly_churn']
+    axes[1, 0].plot(range(len(monthly_churn)), monthly_churn.values * 100,
+                    marker='o', linewidth=2, color='#A23B72')
+    axes[1, 0].fill_between(range(len(monthly_churn)), monthly_churn.values * 100,
+                            alpha=0.3, color='#A23B72')
+    axes[1, 0].set_xticks(range(len(monthly_churn)))
+    axes[1, 0].set_xticklabels([str(x) for x in monthly_churn.index], rotation=45)
+    axes[1, 0].set_xlabel('Monthly Charges Range ($)')
+    axes[1, 0].set_ylabel('Churn Rate (%)')
+    axes[1, 0].set_title('Monthly Charges Range (Equal-Frequency Bins) vs Churn Rate',
+                         fontweight='bold')
+    axes[1, 0].grid(True, alpha=0.3)
+
+    if 'density' in data:
+        _tenure_charges_density(axes[1, 1], fig, *data['density'])
+    else:
+        tenure, total_charges, churn = data['scatter']
+        scatter = axes[1, 1].scatter(tenure, total_charges, c=churn, alpha=0.6,
+                                     cmap='coolwarm', s=30)
+        axes[1, 1].set_title('Tenure vs Total Charges (Color: Churn)', fontweight='bold')
+        plt.colorbar(scatter, ax=axes[1, 1], label='Churn (0=Stayed, 1=Churned)')
+    axes[1, 1].set_xlabel('Tenure (Months)')
+    axes[1, 1].set_ylabel('Total Charges ($)')
+    axes[1, 1].grid(True, alpha=0.3)
+    return fig
+
+
+def _tenure_charges_density(ax, fig, x_edges, y_edges, counts):
+    """密度模式：每个分箱单元按流失占比着色，空单元留白，替代逐点散点图。"""
+    total = counts.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rate = np.where(total > 0, counts[1] / total, np.nan)
+    mesh = ax.pcolormesh(x_edges, y_edges, np.ma.masked_invalid(rate).T,
+                         cmap='coolwarm', vmin=0, vmax=1, shading='flat')
+    ax.set_title('Tenure vs Total Charges (Color: Churn Share per Cell)', fontweight='bold')
+    fig.colorbar(mesh, ax=ax, label='Churned Share (0=Stayed, 1=Churned)')
+
+
+def render_correlation_analysis(data):
+    """特征相关性热力图 + 与流失最相关的特征。"""
+    correlation_matrix = data['correlation_matrix']
+    fig, axes = plt.subplots(1, 2, figsize=(18, 8))
+
+    axes[0].imshow(correlation_matrix, cmap='coolwarm', aspect='auto')
+    axes[0].set_xticks(range(len(correlation_matrix.columns)))
+    axes[0].set_yticks(range(len(correlation_matrix.columns)))
+    axes[0].set_xticklabels(list(correlation_matrix.columns), rotation=45, ha='right')
+    axes[0].set_yticklabels(list(correlation_matrix.columns))
+    axes[0].set_title('Feature Correlation Heatmap', fontweight='bold', fontsize=14)
+    for i in range(len(correlation_matrix.columns)):
+        for j in range(len(correlation_matrix.columns)):
+            axes[0].text(j, i, f'{correlation_matrix.iloc[i, j]:.2f}',
+                         ha="center", va="center", color="w", fontsize=9)
+
+    churn_corr = correlation_matrix['Churn'].drop('Churn').sort_values(ascending=False)
+    axes[1].barh(range(len(churn_corr)), churn_corr.values,
+                 color=np.where(churn_corr.values > 0, '#A23B72', '#4B8BBE'))
+    axes[1].set_yticks(range(len(churn_corr)))
+    axes[1].set_yticklabels(list(churn_corr.index))
+    axes[1].set_xlabel('Correlation Coefficient')
+    axes[1].set_title('Feature Correlation with Churn', fontweight='bold', fontsize=14)
+    axes[1].axvline(x=0, color='black', linestyle='-', linewidth=0.5)
+    for i, val in enumerate(churn_corr.values):
+        axes[1].text(val + (0.01 if val >= 0 else -0.01), i, f'{val:.3f}',
+                     va='center', ha='left' if val >= 0 else 'right',
+                     color='black', fontweight='bold')
+    return fig
+
+
+def render_retention_curves(data):
+    """整体与按合同类型、互联网服务、支付方式分层的在网时长留存曲线。"""
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    axes = axes.flatten()
+    titles = {'Contract': 'Contract Type', 'InternetService': 'Internet Service',
+              'PaymentMethod': 'Payment Method'}
+    colors = ['#4B8BBE', '#FFD43B', '#A23B72', '#306998']
+
+    _retention_step(axes[0], data['overall'], '#A23B72', band=True)
+    axes[0].set_title('Overall Retention (95% CI)', fontweight='bold')
+    for ax, (dimension, curves) in zip(axes[1:], data['strata'].items()):
+        for color, (value, curve) in zip(colors, curves.items()):
+            _retention_step(ax, curve, color, label=str(value))
+        ax.set_title(f'Retention by {titles.get(dimension, dimension)}', fontweight='bold')
+        ax.legend(loc='lower left')
+    for ax in axes:
+        ax.set_xlabel('Tenure (Months)')
+        ax.set_ylabel('Retention (%)')
+        ax.set_ylim(0, 102)
+        ax.grid(True, alpha=0.3)
+    return fig
+
+
+def render_feature_importance(data):
+    """分类特征重要性：Cramér's V 与互信息排序条形图。"""
+    ranking = data['ranking'].iloc[::-1]
+    fig, axes = plt.subplots(1, 2, figsize=(18, 8))
+    positions = range(len(ranking))
+    for ax, column, color, xlabel in (
+            (axes[0], 'cramers_v', '#A23B72', "Cramér's V"),
+            (axes[1], 'mutual_info', '#4B8BBE', 'Mutual Information (bits)')):
+        ax.barh(positions, ranking[column], color=color, alpha=0.8)
+        ax.set_yticks(positions)
+        ax.set_yticklabels(list(ranking.index))
+        ax.set_xlabel(xlabel)
+        ax.grid(True, axis='x', alpha=0.3)
+        for i, val in enumerate(ranking[column]):
+            ax.text(val, i, f' {val:.3f}', va='center', fontsize=9)
+    axes[0].set_title("Categorical Feature Importance (Cramér's V)", fontweight='bold', fontsize=14)
+    axes[1].set_title('Mutual Information with Churn', fontweight='bold', fontsize=14)
+    return fig
+
+
+RENDERERS = {
+    'churn_overview': render_churn_overview,
+    'demographic_analysis': render_demographic_analysis,
+    'service_analysis': render_service_analysis,
+    'contract_payment_analysis': render_contract_payment_analysis,
+    'financial_analysis': render_financial_analysis,
+    'correlation_analysis': render_correlation_analysis,
+    'retention_curves': render_retention_curves,
+    'feature_importance': render_feature_importance,
+}
+
+
+# ==============================
+# 渲染流水线
+# ==============================
+
+def render_chart(name, data, images_dir, dpi=DEFAULT_DPI):
+    """渲染并保存单张图表，返回 (图表名, 文件路径, 耗时秒数)。"""
+    start = time.perf_counter()
+    setup_style()
+    fig = RENDERERS[name](data)
+    fig.tight_layout()
+    path = os.path.join(images_dir, f'{name}.png')
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    return name, path, time.perf_counter() - start
+
+
+def render_all(chart_data, images_dir, dpi=DEFAULT_DPI, processes=None):
+    """并发渲染所有图表，返回 {图表名: 耗时秒数}。
+
+    processes=1 或当前平台不支持 fork 时在本进程内依次渲染。
+    """
+    os.makedirs(images_dir, exist_ok=True)
+    names = [name for name in CHART_NAMES if name in chart_data]
+    context = pool_context()
+    timings = {}
+    if processes == 1 or context is None or len(names) <= 1:
+        for name in names:
+            _, _, seconds = render_chart(name, chart_data[name], images_dir, dpi)
+            timings[name] = seconds
+        return timings
+
+    workers = min(processes or os.cpu_count() or 1, len(names))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [pool.submit(render_chart, name, chart_data[name], images_dir, dpi)
+                   for name in names]
+        for future in futures:
+            name, _, seconds = future.result()
+            timings[name] = seconds
+    return timings
@@ -0,0 +1,93 @@
+# ==============================
+# 内存映射的数值列存储
+# ==============================
+#
+# 财务统计、直方图、散点/密度图和相关性分析会反复扫描 tenure、MonthlyCharges、
+# TotalCharges 和 Churn。预处理阶段把这几列各自写成连续的 .npy 文件
+# （自带 dtype/形状头），再加一个 meta.json 描述行数、列和来源哈希。
+# 下游通过 np.load(mmap_mode='r') 得到零拷贝的只读视图；同一台机器上的
+# 多个分析进程共享同一份页缓存，而不是各自持有一份 DataFrame。
+
+import json
+import os
+
+import numpy as np
+
+from .cache import DEFAULT_CACHE_DIR, cache_path, source_hash
+
+STORE_VERSION = 1
+STORE_COLUMNS = ['tenure', 'MonthlyCharges', 'TotalCharges', 'Churn']
+META_FILE = 'meta.json'
+
+
+def write_column_store(df, directory, columns=STORE_COLUMNS, source_digest=None):
+    """把指定数值列写成连续的 .npy 文件，并写入元数据头 meta.json。"""
+    os.makedirs(directory, exist_ok=True)
+    meta = {'version': STORE_VERSION, 'n_rows': len(df), 'source_digest': source_digest,
+            'columns': {}}
+    for col in columns:
+        values = np.ascontiguousarray(df[col].to_numpy())
+        out = np.lib.format.open_memmap(os.path.join(directory, f'{col}.npy'), mode='w+',
+                                        dtype=values.dtype, shape=values.shape)
+        out[:] = values
+        out.flush()
+        del out
+        meta['columns'][col] = str(values.dtype)
+    # meta.json 最后写入，作为列文件已完整写出的标记
+    with open(os.path.join(directory, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return directory
+
+
+class ColumnStore:
+    """按列名访问内存映射数组的只读列存储。"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self._arrays = {}
+
+    @property
+    def columns(self):
+        return list(self.meta['columns'])
+
+    def __len__(self):
+        return self.meta['n_rows']
+
+    def __contains__(self, col):
+        return col in self.meta['columns']
+
+    def __getitem__(self, col):
+        if col not in self._arrays:
+            if col not in self:
+                raise KeyError(col)
+            self._arrays[col] = np.load(os.path.join(self.directory, f'{col}.npy'),
+                                        mmap_mode='r')
+        return self._arrays[col]
+
+
+def open_column_store(directory):
+    return ColumnStore(directory)
+
+
+def _is_valid(directory, digest, columns):
+    meta_path = os.path.join(directory, META_FILE)
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    return (meta.get('version') == STORE_VERSION and meta.get('source_digest') == digest
+            and all(col in meta.get('columns', {}) for col in columns))
+
+
+def ensure_column_store(source_path, df, cache_dir=DEFAULT_CACHE_DIR, columns=STORE_COLUMNS):
+    """返回与原始CSV内容对应的列存储；不存在或已过期时由 df 重建。
+
+    目录与预处理缓存同名（后缀 .columns），随原始数据或预处理版本变化而失效。
+    """
+    digest = df.attrs.get('source_digest') or source_hash(source_path)
+    directory = os.path.splitext(cache_path(source_path, cache_dir, digest))[0] + '.columns'
+    if not _is_valid(directory, digest, columns):
+        write_column_store(df, directory, columns, source_digest=digest)
+    return open_column_store(directory)
@@ -0,0 +1,63 @@
+# ==============================
+# 可合并的流式相关系数
+# ==============================
+#
+# 相关系数矩阵由 n、均值向量和离差叉积矩阵 M2 = Σ(x-μ)(x-μ)ᵀ 得到。
+# 每个分块先算自身的均值与 M2，再按 Chan 等人的并行合并公式并入总状态，
+# 避免直接累加 Σxxᵀ 时大数相减造成的精度损失。状态可逐块更新，
+# 也可以在不同进程/分区之间合并，最终结果与 df[cols].corr() 一致。
+
+import numpy as np
+import pandas as pd
+
+# 每次转换为 float64 的最大行数，限制临时内存
+DEFAULT_BLOCK_ROWS = 1_000_000
+
+
+class CorrelationAccumulator:
+    """按列累积 n、均值和离差叉积矩阵的相关系数累加器。"""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros((k, k))
+
+    def _combine(self, n_b, mean_b, m2_b):
+        """Chan 并行合并：把另一组 (n, 均值, M2) 并入当前状态。"""
+        if n_b == 0:
+            return
+        n_a = self.n
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * (n_b / n)
+        self.m2 = self.m2 + m2_b + np.outer(delta, delta) * (n_a * n_b / n)
+        self.n = n
+
+    def update(self, df, block_rows=DEFAULT_BLOCK_ROWS):
+        """累加一个 DataFrame（按行分块转换为 float64，不整体物化）。"""
+        for start in range(0, len(df), block_rows):
+            x = df.iloc[start:start + block_rows][self.columns].to_numpy(dtype=np.float64)
+            mean_b = x.mean(axis=0)
+            centered = x - mean_b
+            self._combine(len(x), mean_b, centered.T @ centered)
+        return self
+
+    def merge(self, other):
+        """合并另一个累加器（列顺序必须一致）。"""
+        if other.columns != self.columns:
+            raise ValueError("合并的相关系数累加器列不一致")
+        self._combine(other.n, other.mean, other.m2)
+        return self
+
+    def matrix(self):
+        """皮尔逊相关系数矩阵。"""
+        std = np.sqrt(np.diag(self.m2))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.m2 / np.outer(std, std)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def ranking(self, target='Churn'):
+        """各特征与目标列的相关系数，从高到低排序（与流失相关性条形图一致）。"""
+        return self.matrix()[target].drop(target).sort_values(ascending=False)
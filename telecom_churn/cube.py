@@ -0,0 +1,283 @@
+# ==============================
+# 细分客户立方体 - 预计算的多维流失统计与切片查询
+# ==============================
+#
+# 报告各章节只回答固定的单维度问题，组合细分（例如 “光纤 + 月付合同 + 电子支票，
+# 在网 < 6 个月”）需要重新对行数据分组。这里预先把所有分类维度以及分箱后的
+# 在网时长/月费编码成一个组合键，对每个出现过的组合单元记录客户数与流失数。
+# 任意切片（筛选条件）与上卷（按部分维度汇总）只在单元数组上做掩码与 bincount，
+# 不再读取行数据；单元数受组合取值数限制，通常远小于客户数。
+#
+# 用法:
+#     python -m telecom_churn.cube segment_cube.npz --by Contract \
+#         --where InternetService="Fiber optic" --where PaymentMethod="Electronic check" \
+#         --where tenure=0:6
+
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import _codes
+from .preprocess import CONTRACT_FEATURES, DEMOGRAPHIC_FEATURES, INTERNET_ADDONS
+
+CUBE_VERSION = 1
+# 主脚本保存立方体时使用的文件名（各区域分区目录下均为同名文件）
+CUBE_FILENAME = 'segment_cube.npz'
+
+# 分箱维度：取值为各分箱的下边界，切片范围需对齐到分箱边界
+TENURE_BAND = 6
+MONTHLY_CHARGES_BAND = 10.0
+BANDED_DIMENSIONS = {'tenure': TENURE_BAND, 'MonthlyCharges': MONTHLY_CHARGES_BAND}
+
+CUBE_DIMENSIONS = (CONTRACT_FEATURES + ['InternetService', 'PhoneService', 'MultipleLines',
+                                        'PaperlessBilling']
+                   + INTERNET_ADDONS + DEMOGRAPHIC_FEATURES + list(BANDED_DIMENSIONS))
+
+
+def _band(values, width):
+    """数值列按固定宽度分箱，返回 (整数编码, 分箱下边界)。"""
+    lower = np.floor_divide(np.asarray(values, dtype=np.float64), width)
+    bins, codes = np.unique(lower, return_inverse=True)
+    edges = bins * width
+    if float(width).is_integer():
+        edges = edges.astype(np.int64)
+    return codes, edges
+
+
+def _dimension_codes(df, dim):
+    """返回 (编码, 取值列表)；缺失值追加为最后一个取值 None。"""
+    if dim in BANDED_DIMENSIONS:
+        codes, uniques = _band(df[dim].to_numpy(), BANDED_DIMENSIONS[dim])
+    else:
+        codes, uniques = _codes(df[dim])
+    uniques = [v.item() if isinstance(v, np.generic) else v for v in uniques]
+    if (codes < 0).any():
+        codes = np.where(codes < 0, len(uniques), codes)
+        uniques.append(None)
+    return np.asarray(codes, dtype=np.int64), uniques
+
+
+def _reduce_cells(dims, codes, counts, churn):
+    """相同组合的单元合并：混合进制编码成一个 int64 键后 np.unique 汇总。"""
+    sizes = [int(codes[d].max()) + 1 if len(codes[d]) else 1 for d in dims]
+    if np.prod(np.asarray(sizes, dtype=np.float64)) >= 2 ** 62:
+        raise ValueError("立方体维度组合过多，无法编码为 int64 键")
+    key = np.zeros(len(counts), dtype=np.int64)
+    for d, size in zip(dims, sizes):
+        key *= size
+        key += codes[d]
+    cells, inverse = np.unique(key, return_inverse=True)
+    new_counts = np.bincount(inverse, weights=counts, minlength=len(cells)).astype(np.int64)
+    new_churn = np.bincount(inverse, weights=churn, minlength=len(cells)).astype(np.int64)
+    new_codes = {}
+    for d, size in zip(reversed(dims), reversed(sizes)):
+        cells, new_codes[d] = np.divmod(cells, size)
+    return {d: new_codes[d].astype(np.int32) for d in dims}, new_counts, new_churn
+
+
+class SegmentCube:
+    """稀疏的多维流失立方体：每个出现过的维度组合保存客户数与流失数。"""
+
+    def __init__(self, dimensions, levels, codes, counts, churn):
+        self.dimensions = list(dimensions)
+        self.levels = {d: list(levels[d]) for d in self.dimensions}
+        self.codes = codes
+        self.counts = counts
+        self.churn = churn
+
+    @classmethod
+    def from_frame(cls, df, dimensions=CUBE_DIMENSIONS, target='Churn'):
+        """一次遍历行数据构建立方体。"""
+        dimensions = list(dimensions)
+        codes, levels = {}, {}
+        for dim in dimensions:
+            codes[dim], levels[dim] = _dimension_codes(df, dim)
+        y = df[target].to_numpy().astype(np.int64)
+        codes, counts, churn = _reduce_cells(dimensions, codes, np.ones(len(y)), y)
+        return cls(dimensions, levels, codes, counts, churn)
+
+    def __len__(self):
+        """单元数（出现过的维度组合数）。"""
+        return len(self.counts)
+
+    @property
+    def n_rows(self):
+        return int(self.counts.sum())
+
+    def merge(self, other):
+        """合并另一个立方体（例如另一个分块或分区），取值按内容对齐。"""
+        if other.dimensions != self.dimensions:
+            raise ValueError("立方体维度不一致，无法合并")
+        levels, codes = {}, {}
+        for d in self.dimensions:
+            merged = list(self.levels[d])
+            merged += [v for v in other.levels[d] if v not in merged]
+            position = {v: i for i, v in enumerate(merged)}
+            remap = np.array([position[v] for v in other.levels[d]], dtype=np.int64)
+            levels[d] = merged
+            codes[d] = np.concatenate([self.codes[d].astype(np.int64),
+                                       remap[other.codes[d]] if len(remap) else other.codes[d]])
+        counts = np.concatenate([self.counts, other.counts])
+        churn = np.concatenate([self.churn, other.churn])
+        self.codes, self.counts, self.churn = _reduce_cells(self.dimensions, codes, counts, churn)
+        self.levels = levels
+        return self
+
+    # ------------------------------
+    # 查询
+    # ------------------------------
+
+    def _allowed(self, dim, condition):
+        """把一个筛选条件转换为允许的取值编码。
+
+        条件可以是单个取值、取值列表/集合，或 slice(lo, hi) 表示 lo <= 值 < hi；
+        分箱维度的范围必须对齐到分箱边界，保证结果精确。
+        """
+        if dim not in self.levels:
+            raise KeyError(f"立方体中没有维度: {dim}")
+        levels = self.levels[dim]
+        if isinstance(condition, slice):
+            lo, hi = condition.start, condition.stop
+            width = BANDED_DIMENSIONS.get(dim)
+            if width is not None:
+                for bound in (lo, hi):
+                    if bound is not None and not float(bound / width).is_integer():
+                        raise ValueError(f"{dim} 的范围 {bound} 不在分箱边界上（宽度 {width}）")
+
+            def inside(v):
+                # 分箱维度要求整个分箱 [v, v + width) 落在范围内
+                end_ok = hi is None or (v + width <= hi if width is not None else v < hi)
+                return (lo is None or v >= lo) and end_ok
+
+            return [i for i, v in enumerate(levels) if v is not None and inside(v)]
+        if isinstance(condition, (list, tuple, set, frozenset)):
+            return [i for i, v in enumerate(levels) if v in condition]
+        return [i for i, v in enumerate(levels) if v == condition]
+
+    def mask(self, **where):
+        """满足全部筛选条件的单元掩码。"""
+        keep = np.ones(len(self), dtype=bool)
+        for dim, condition in where.items():
+            keep &= np.isin(self.codes[dim], self._allowed(dim, condition))
+        return keep
+
+    def query(self, by=None, **where):
+        """切片 + 上卷：先按 where 筛选单元，再按 by 中的维度汇总。
+
+        返回列为 [count, churn, rate] 的 DataFrame；by 为空时返回一行总计。
+        """
+        keep = self.mask(**where)
+        counts = self.counts[keep]
+        churn = self.churn[keep]
+        by = [by] if isinstance(by, str) else list(by or [])
+        if not by:
+            total = int(counts.sum())
+            out = pd.DataFrame({'count': [total], 'churn': [int(churn.sum())]},
+                               index=pd.Index(['total']))
+        else:
+            for d in by:
+                if d not in self.levels:
+                    raise KeyError(f"立方体中没有维度: {d}")
+            # 只对实际出现的组合做 bincount，数组大小不随 by 维度取值个数的乘积增长
+            codes, count_by, churn_by = _reduce_cells(
+                by, {d: self.codes[d][keep].astype(np.int64) for d in by}, counts, churn)
+            labels = [[self.levels[d][i] for i in codes[d]] for d in by]
+            index = (pd.Index(labels[0], name=by[0]) if len(by) == 1
+                     else pd.MultiIndex.from_arrays(labels, names=by))
+            out = pd.DataFrame({'count': count_by, 'churn': churn_by}, index=index)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out['rate'] = out['churn'] / out['count']
+        return out
+
+    def segment(self, **where):
+        """单个细分的 (客户数, 流失数, 流失率)。"""
+        row = self.query(**where).iloc[0]
+        return int(row['count']), int(row['churn']), row['rate']
+
+    # ------------------------------
+    # 持久化
+    # ------------------------------
+
+    def save(self, path):
+        """保存为 .npz：各维度编码、客户数、流失数，取值表以 JSON 存放。"""
+        meta = {'version': CUBE_VERSION, 'dimensions': self.dimensions, 'levels': self.levels}
+        arrays = {f'codes_{i}': self.codes[d] for i, d in enumerate(self.dimensions)}
+        np.savez_compressed(path, meta=np.array(json.dumps(meta, ensure_ascii=False)),
+                            counts=self.counts, churn=self.churn, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('version') != CUBE_VERSION:
+                raise ValueError(f"立方体文件版本不兼容: {path}")
+            dims = meta['dimensions']
+            codes = {d: data[f'codes_{i}'] for i, d in enumerate(dims)}
+            return cls(dims, meta['levels'], codes, data['counts'], data['churn'])
+
+
+def build_cube(path, chunksize=None):
+    """从原始CSV构建立方体（经数据质量校验）；指定 chunksize 时逐块构建并合并。"""
+    from .streaming import iter_chunks
+    from .validate import read_validated
+
+    if chunksize is None:
+        return SegmentCube.from_frame(read_validated(path))
+    cube = None
+    for chunk in iter_chunks(path, chunksize):
+        part = SegmentCube.from_frame(chunk)
+        cube = part if cube is None else cube.merge(part)
+    return cube
+
+
+def parse_condition(text):
+    """解析命令行筛选条件：a:b 为范围，a,b 为取值列表，数字自动转换。"""
+    def value(token):
+        for cast in (int, float):
+            try:
+                return cast(token)
+            except ValueError:
+                pass
+        return token
+
+    if ':' in text:
+        lo, hi = text.split(':', 1)
+        return slice(value(lo) if lo else None, value(hi) if hi else None)
+    if ',' in text:
+        return [value(token) for token in text.split(',')]
+    return value(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="电信客户流失分析 - 细分立方体查询")
+    parser.add_argument('path', help="已保存的立方体(.npz)或原始CSV")
+    parser.add_argument('--by', action='append', default=[], help="上卷维度，可重复")
+    parser.add_argument('--where', action='append', default=[],
+                        help="筛选条件 维度=取值，范围写作 lo:hi，列表写作 a,b")
+    parser.add_argument('--save', default=None, help="从CSV构建时把立方体保存到该路径")
+    args = parser.parse_args(argv)
+
+    if args.path.endswith('.npz'):
+        cube = SegmentCube.load(args.path)
+    else:
+        cube = build_cube(args.path)
+        if args.save:
+            cube.save(args.save)
+    where = {}
+    for item in args.where:
+        dim, _, text = item.partition('=')
+        where[dim] = parse_condition(text)
+    try:
+        result = cube.query(by=args.by, **where)
+    except KeyError as exc:
+        parser.error(exc.args[0])
+    except ValueError as exc:
+        parser.error(str(exc))
+    print(f"📦 立方体: {len(cube):,} 个单元，{cube.n_rows:,} 名客户")
+    print(result.to_string(formatters={'rate': '{:.2%}'.format}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,302 @@
+# ==============================
+# 处理后数据的分块导出 - 压缩、列式格式与分区
+# ==============================
+#
+# 清洗后的数据按行分块写出，不再一次性 df.to_csv 整张表：
+#   - CSV 可选 gzip / zstd 压缩（zstd 需要 zstandard 包）。分块在线程池中并行格式化；
+#     gzip 每个分块独立压缩成一个 member，顺序拼接后仍是一个合法的 gzip 文件；
+#     zstd 整个文件只写一个 frame（多线程压缩器流式写入）——pandas 读取 .zst 时
+#     部分 zstandard 版本只解压第一个 frame，多 frame 文件会被悄悄截断；
+#   - Parquet 列式格式（需要 pyarrow），每个分块写成一个行组，默认 snappy 压缩；
+#   - 可按 Contract 或 InternetService 分区，每个取值写到 <列名>=<取值>/ 子目录，
+#     下游作业只读取需要的分区；不同分区的文件并行写入（Parquet 文件中不重复存储分区列）。
+# 与分块读取（streaming.iter_chunks，经数据质量校验）配合时，内存占用只与分块大小有关。
+#
+# 用法:
+#     python -m telecom_churn.export WA_Fn-UseC_-Telco-Customer-Churn.csv telecom_churn_processed --format parquet --partition-by Contract
+#     python -m telecom_churn.export synthetic_1m.csv processed --compression zstd --chunksize 200000 --workers 8 --verify
+
+import argparse
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from .streaming import DEFAULT_CHUNKSIZE, iter_chunks
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 为可选依赖，缺失时只能导出CSV
+    pa = None
+    pq = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard 为可选依赖，缺失时不支持 zstd 压缩的CSV
+    zstandard = None
+
+EXPORT_FORMATS = ('csv', 'parquet')
+COMPRESSIONS = ('gzip', 'zstd')
+PARTITION_COLUMNS = ('Contract', 'InternetService')
+# 缺失值所在分区的目录名（与 Hive 分区约定一致）
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+# zstd 压缩线程数，-1 表示使用全部逻辑CPU
+ZSTD_THREADS = -1
+# 校验导出结果时逐块读回的行数
+VERIFY_CHUNK_ROWS = 500_000
+
+_CSV_EXTENSIONS = {None: '.csv', 'gzip': '.csv.gz', 'zstd': '.csv.zst'}
+
+
+def export_extension(fmt='csv', compression=None):
+    """导出文件的扩展名，例如 .csv.gz / .parquet。"""
+    return '.parquet' if fmt == 'parquet' else _CSV_EXTENSIONS[compression]
+
+
+def check_options(fmt='csv', compression=None, partition_by=None):
+    """检查导出选项与可选依赖，不支持时抛出 ValueError。"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f"不支持的压缩方式: {compression}")
+    if partition_by is not None and partition_by not in PARTITION_COLUMNS:
+        raise ValueError(f"只能按 {' / '.join(PARTITION_COLUMNS)} 分区: {partition_by}")
+    if fmt == 'parquet' and pq is None:
+        raise ValueError("导出 Parquet 需要安装 pyarrow")
+    if fmt == 'csv' and compression == 'zstd' and zstandard is None:
+        raise ValueError("zstd 压缩的CSV需要安装 zstandard")
+
+
+class _CsvSink:
+    """一个CSV文件；encode 可在多个线程中并行调用，write 按顺序追加。"""
+
+    def __init__(self, path, compression=None, partition_by=None):
+        self.path = path
+        self.compression = compression
+        self.rows = 0
+        self.header = True
+        self._file = open(path, 'wb')
+        self._stream = None
+        if compression == 'zstd':
+            # 单个 frame 的流式压缩，压缩本身由 zstd 内部的线程并行
+            compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=ZSTD_THREADS)
+            self._stream = compressor.stream_writer(self._file)
+
+    def encode(self, frame, header):
+        data = frame.to_csv(index=False, header=header).encode('utf-8')
+        if self.compression == 'gzip':
+            return gzip.compress(data, compresslevel=GZIP_LEVEL)
+        return data
+
+    def write(self, encoded, rows):
+        (self._stream or self._file).write(encoded)
+        self.rows += rows
+
+    def close(self):
+        if self._stream is not None:
+            # 写出 frame 结尾并关闭底层文件
+            self._stream.close()
+        self._file.close()
+
+
+class _ParquetSink:
+    """一个 Parquet 文件；每个分块转换为 Arrow 表后写成一个行组。
+
+    按 Hive 约定，分区列不写入文件，读取分区目录时由目录名恢复。
+    """
+
+    def __init__(self, path, compression=None, partition_by=None):
+        self.path = path
+        self.compression = compression or 'snappy'
+        self.partition_by = partition_by
+        self.rows = 0
+        self.header = True
+        self._writer = None
+
+    def encode(self, frame, header):
+        if self.partition_by is not None:
+            frame = frame.drop(columns=self.partition_by)
+        return pa.Table.from_pandas(frame, preserve_index=False)
+
+    def write(self, table, rows):
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema,
+                                            compression=self.compression)
+        self._writer.write_table(table)
+        self.rows += rows
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _partition_dir(column, value):
+    if value is None:
+        return f'{column}={NULL_PARTITION}'
+    return f'{column}={str(value).replace(os.sep, "_").replace("/", "_")}'
+
+
+class ChunkedExporter:
+    """分块写出清洗后的数据，可压缩、可按列分区，分块在线程池中并行编码。
+
+    未分区时 base + 扩展名 为单个输出文件；分区时 base 为目录，
+    每个分区写到 base/<列名>=<取值>/part-0<扩展名>。
+    """
+
+    def __init__(self, base, fmt='csv', compression=None, partition_by=None,
+                 chunk_rows=DEFAULT_CHUNKSIZE, workers=None):
+        check_options(fmt, compression, partition_by)
+        self.base = base
+        self.fmt = fmt
+        self.compression = compression
+        self.partition_by = partition_by
+        self.chunk_rows = chunk_rows
+        self.workers = workers or os.cpu_count() or 1
+        self._sinks = {}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+
+    @property
+    def path(self):
+        """输出文件（未分区）或分区根目录。"""
+        if self.partition_by is None:
+            return self.base + export_extension(self.fmt, self.compression)
+        return self.base
+
+    def _sink(self, key):
+        sink = self._sinks.get(key)
+        if sink is None:
+            if self.partition_by is None:
+                path = self.path
+            else:
+                directory = os.path.join(self.base, _partition_dir(self.partition_by, key))
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, 'part-0' + export_extension(self.fmt,
+                                                                           self.compression))
+            sink_class = _ParquetSink if self.fmt == 'parquet' else _CsvSink
+            sink = self._sinks[key] = sink_class(path, self.compression, self.partition_by)
+        return sink
+
+    def _split(self, frame):
+        """按分区列拆分分块，产出 (分区取值, 子表)；未分区时只有一个分区。"""
+        if self.partition_by is None:
+            yield None, frame
+            return
+        column = frame[self.partition_by]
+        for value, index in column.groupby(column, observed=True, sort=False).indices.items():
+            yield value, frame.iloc[index]
+        missing = column.isna().to_numpy()
+        if missing.any():
+            yield None, frame[missing]
+
+    def write(self, frame):
+        """写出一批数据：按 chunk_rows 切块、按分区拆分后并行编码，再按分区并行写入。"""
+        jobs = []
+        for start in range(0, len(frame), self.chunk_rows):
+            for key, part in self._split(frame.iloc[start:start + self.chunk_rows]):
+                sink = self._sink(key)
+                # 每个文件只在第一个分块写表头
+                jobs.append((sink, part, sink.header))
+                sink.header = False
+        encoded = list(self._executor.map(lambda job: job[0].encode(job[1], job[2]), jobs))
+        # 同一文件的分块按原顺序写入，不同文件之间并行
+        by_sink = {}
+        for (sink, part, _), data in zip(jobs, encoded):
+            by_sink.setdefault(sink, []).append((data, len(part)))
+        list(self._executor.map(lambda item: [item[0].write(*block) for block in item[1]],
+                                by_sink.items()))
+        return len(frame)
+
+    def close(self):
+        """关闭所有文件，返回 {文件路径: 行数}。"""
+        self._executor.shutdown()
+        for sink in self._sinks.values():
+            sink.close()
+        return {sink.path: sink.rows for sink in self._sinks.values()}
+
+
+def export_frame(df, base, fmt='csv', compression=None, partition_by=None,
+                 chunk_rows=DEFAULT_CHUNKSIZE, workers=None):
+    """分块导出内存中的 DataFrame，返回 {文件路径: 行数}。"""
+    exporter = ChunkedExporter(base, fmt, compression, partition_by, chunk_rows, workers)
+    try:
+        # 每批 workers 个分块，编码结果占用的内存不随数据规模增长
+        batch = exporter.chunk_rows * exporter.workers
+        for start in range(0, len(df), batch):
+            exporter.write(df.iloc[start:start + batch])
+    finally:
+        files = exporter.close()
+    return files
+
+
+def export_csv(path, base, fmt='csv', compression=None, partition_by=None,
+               chunksize=DEFAULT_CHUNKSIZE, workers=None):
+    """分块读取原始CSV、校验并清洗后分块导出，不把整个数据集读入内存。"""
+    exporter = ChunkedExporter(base, fmt, compression, partition_by, chunksize, workers)
+    try:
+        for chunk in iter_chunks(path, chunksize * exporter.workers):
+            exporter.write(chunk)
+    finally:
+        files = exporter.close()
+    return files
+
+
+def count_rows(path):
+    """读回一个导出文件的行数：Parquet 读取元数据，CSV 按扩展名解压后逐块读取。"""
+    if path.endswith('.parquet'):
+        return pq.read_metadata(path).num_rows
+    return sum(len(chunk) for chunk in pd.read_csv(path, usecols=[0],
+                                                   chunksize=VERIFY_CHUNK_ROWS))
+
+
+def verify_export(files):
+    """用 pd.read_csv / pyarrow 读回导出的文件，返回行数与写出时不一致的 {路径: (写出, 读回)}。"""
+    mismatched = {}
+    for file_path, rows in files.items():
+        read_back = count_rows(file_path)
+        if read_back != rows:
+            mismatched[file_path] = (rows, read_back)
+    return mismatched
+
+
+def print_files(files):
+    for file_path, rows in sorted(files.items()):
+        print(f"   - {file_path}: {rows:,} 行")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="电信客户流失分析 - 处理后数据分块导出")
+    parser.add_argument('input', help="原始CSV路径")
+    parser.add_argument('output', help="输出文件名（不含扩展名）；分区导出时为目录")
+    parser.add_argument('--format', default='csv', choices=EXPORT_FORMATS)
+    parser.add_argument('--compression', default=None, choices=COMPRESSIONS,
+                        help="CSV 的压缩方式；Parquet 默认 snappy")
+    parser.add_argument('--partition-by', default=None, choices=PARTITION_COLUMNS)
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="每个分块的行数")
+    parser.add_argument('--workers', type=int, default=None, help="并行编码线程数（默认CPU核数）")
+    parser.add_argument('--verify', action='store_true', help="导出后读回各文件并核对行数")
+    args = parser.parse_args(argv)
+
+    try:
+        check_options(args.format, args.compression, args.partition_by)
+    except ValueError as exc:
+        parser.error(str(exc))
+    files = export_csv(args.input, args.output, args.format, args.compression,
+                       args.partition_by, args.chunksize, args.workers)
+    print(f"✅ 已导出 {sum(files.values()):,} 行处理后的数据:")
+    print_files(files)
+    if args.verify:
+        mismatched = verify_export(files)
+        for file_path, (rows, read_back) in sorted(mismatched.items()):
+            print(f"⚠️ {file_path}: 写出 {rows:,} 行，读回 {read_back:,} 行")
+        if mismatched:
+            parser.exit(1)
+        print("✅ 读回校验通过")
+
+
+if __name__ == '__main__':
+    main()
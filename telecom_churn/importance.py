@@ -0,0 +1,147 @@
+# ==============================
+# 特征重要性排序 - 卡方检验、Cramér's V 与互信息
+# ==============================
+#
+# 相关系数矩阵只覆盖数值/二元列，Contract、PaymentMethod、InternetService
+# 以及各项附加服务这些多取值分类变量没有参与比较。这里对每个分类变量与 Churn
+# 的列联表计算卡方统计量、p 值、Cramér's V 和互信息，并按 Cramér's V 排序。
+# 列联表直接来自 aggregate.aggregate_dimensions 的聚合表（所有维度一次 bincount），
+# 各统计量在所有维度拼接成的一个数组上用 np.bincount 按维度汇总，
+# 因此无论增加多少列，都只需要对行数据扫描一次。
+#
+# 用法:
+#     python -m telecom_churn.importance WA_Fn-UseC_-Telco-Customer-Churn.csv --chunksize 500000
+
+import argparse
+import math
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import ANALYSIS_DIMENSIONS, aggregate_dimensions, merge_aggregates
+
+IMPORTANCE_FEATURES = [d for d in ANALYSIS_DIMENSIONS if d != 'tenure']
+
+_GAMMA_EPS = 1e-14
+_GAMMA_ITERATIONS = 500
+
+
+def _upper_gamma_regularized(a, x):
+    """正则化上不完全伽马函数 Q(a, x)：x < a + 1 用级数，否则用连分式（不依赖 scipy）。"""
+    if x <= 0:
+        return 1.0
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1.0 / a
+        denom = a
+        for _ in range(_GAMMA_ITERATIONS):
+            denom += 1
+            term *= x / denom
+            total += term
+            if abs(term) < abs(total) * _GAMMA_EPS:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+    # Lentz 连分式
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, _GAMMA_ITERATIONS):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < _GAMMA_EPS:
+            break
+    return math.exp(log_prefix) * h
+
+
+def chi2_sf(statistic, dof):
+    """卡方分布的上尾概率（p 值）。"""
+    if dof <= 0:
+        return float('nan')
+    return _upper_gamma_regularized(dof / 2, statistic / 2)
+
+
+def feature_importance(table, features=IMPORTANCE_FEATURES):
+    """由聚合表（(dimension, value) → [count, churn]）计算各维度与流失的关联强度。
+
+    返回按 Cramér's V 降序排列的 DataFrame，列为
+    levels / chi2 / dof / p_value / cramers_v / mutual_info（比特）/ uncertainty（互信息 ÷ 流失熵）。
+    """
+    cells = table.loc[table.index.get_level_values('dimension').isin(features)]
+    cells = cells[cells['count'] > 0]
+    dims = cells.index.get_level_values('dimension')
+    # 每个单元所属的维度编号，之后所有按维度的汇总都是一次 bincount
+    feature_ids, names = pd.factorize(dims)
+    n_features = len(names)
+    count = cells['count'].to_numpy(dtype=np.float64)
+    churn = cells['churn'].to_numpy(dtype=np.float64)
+    # 列联表的两列：[留存, 流失]，形状 (单元数, 2)
+    observed = np.stack([count - churn, churn], axis=1)
+
+    n = np.bincount(feature_ids, weights=count, minlength=n_features)
+    class_totals = np.stack([np.bincount(feature_ids, weights=observed[:, k],
+                                         minlength=n_features) for k in (0, 1)], axis=1)
+    levels = np.bincount(feature_ids, minlength=n_features)
+
+    expected = count[:, None] * class_totals[feature_ids] / n[feature_ids, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        chi2_cells = np.where(expected > 0, (observed - expected) ** 2 / expected, 0.0)
+        # 互信息 Σ p(x,y) log2(p(x,y) / (p(x) p(y)))，空单元贡献为0
+        mi_cells = np.where(observed > 0,
+                            observed / n[feature_ids, None] * np.log2(observed / expected), 0.0)
+        class_p = class_totals / n[:, None]
+        churn_entropy = -np.where(class_p > 0, class_p * np.log2(class_p), 0.0).sum(axis=1)
+    chi2 = np.bincount(feature_ids, weights=chi2_cells.sum(axis=1), minlength=n_features)
+    mutual_info = np.bincount(feature_ids, weights=mi_cells.sum(axis=1), minlength=n_features)
+    # 流失只有两个取值，min(行数-1, 列数-1) = 1
+    dof = levels - 1
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out = pd.DataFrame({
+            'levels': levels,
+            'chi2': chi2,
+            'dof': dof,
+            'p_value': [chi2_sf(s, d) for s, d in zip(chi2, dof)],
+            'cramers_v': np.sqrt(chi2 / n),
+            'mutual_info': mutual_info,
+            'uncertainty': mutual_info / churn_entropy,
+        }, index=pd.Index(names, name='feature'))
+    return out.sort_values('cramers_v', ascending=False)
+
+
+def format_importance(ranking):
+    """排序表格式化为控制台输出的文本。"""
+    shown = ranking.copy()
+    shown['chi2'] = shown['chi2'].map(lambda v: f'{v:,.1f}')
+    shown['p_value'] = shown['p_value'].map(lambda v: f'{v:.2e}')
+    for col in ('cramers_v', 'mutual_info', 'uncertainty'):
+        shown[col] = shown[col].map(lambda v: f'{v:.4f}')
+    return shown.to_string()
+
+
+def main(argv=None):
+    # streaming 的累加器在模块顶层导入本模块，这里延迟导入避免循环引用
+    from .streaming import DEFAULT_CHUNKSIZE, iter_chunks
+
+    parser = argparse.ArgumentParser(description="电信客户流失分析 - 分类特征重要性排序")
+    parser.add_argument('input', help="原始CSV路径")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="每个分块的行数")
+    args = parser.parse_args(argv)
+
+    table = None
+    for chunk in iter_chunks(args.input, args.chunksize):
+        table = merge_aggregates(table, aggregate_dimensions(chunk, IMPORTANCE_FEATURES))
+    print("📊 分类特征与流失的关联强度（按 Cramér's V 排序）:")
+    print(format_importance(feature_importance(table)))
+
+
+if __name__ == '__main__':
+    main()
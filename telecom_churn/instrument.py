@@ -0,0 +1,227 @@
+# ==============================
+# 运行监控 - 各阶段耗时、CPU时间、内存与行数
+# ==============================
+#
+# 为主脚本的每个章节记录墙钟时间、CPU时间、常驻内存（RSS）变化、阶段内峰值内存
+# 和处理行数，运行结束后写成 JSON 与 CSV 运行日志（与 analysis_summary.txt 同目录）。
+# 阶段内峰值：Linux 上每个阶段开始时通过 /proc/self/clear_refs 重置 VmHWM，结束时读取；
+# 不支持重置时由后台线程定时采样 RSS。ru_maxrss 是整个进程生命周期的峰值，
+# 阶段内存低于之前的峰值时增量恒为0，不能用来衡量单个阶段。
+# 深度模式只对选定的一个阶段开启 cProfile 与 tracemalloc，避免拖慢整个运行：
+#     python telecom-churn-analysis.py --profile-stage 7
+#     TELECOM_CHURN_PROFILE_STAGE=7 python telecom-churn-analysis.py
+# 该阶段的调用统计保存为 profile_<阶段>.prof，可用 python -m pstats 或 snakeviz 查看。
+
+import cProfile
+import csv
+import json
+import os
+import platform
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块，不记录峰值内存
+    resource = None
+
+PROFILE_STAGE_ENV = 'TELECOM_CHURN_PROFILE_STAGE'
+RUN_LOG_FIELDS = ['stage', 'name', 'wall_seconds', 'cpu_seconds', 'rows', 'rss_start_mb',
+                  'rss_end_mb', 'peak_rss_mb', 'peak_delta_mb', 'process_peak_rss_mb',
+                  'tracemalloc_peak_mb']
+# 无法重置 VmHWM 时的 RSS 采样间隔（秒）
+RSS_SAMPLE_INTERVAL = 0.01
+
+
+def peak_rss_mb():
+    """当前进程的峰值常驻内存（MB）；Linux 上 ru_maxrss 单位为 KB，macOS 为字节。
+
+    Linux 上 reset_peak_rss 之后 ru_maxrss 也从重置时刻重新累计。
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def current_rss_mb():
+    """当前常驻内存（MB），仅 Linux 通过 /proc 读取，其它平台返回 None。"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def _status_mb(field):
+    """读取 /proc/self/status 中的内存字段（MB），不可用时返回 None。"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, IndexError, ValueError):
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """把本进程的 VmHWM 重置为当前 RSS（Linux 4.0+），成功返回 True。"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return _status_mb('VmHWM') is not None
+
+
+class _RssSampler:
+    """后台线程定时采样 RSS，记录阶段内的最大值（无法重置 VmHWM 时使用）。"""
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = current_rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return self.peak
+
+
+class StagePeak:
+    """测量一个阶段内的峰值 RSS（MB）：优先重置并读取 VmHWM，否则采样。"""
+
+    def __init__(self):
+        self._sampler = None if reset_peak_rss() else _RssSampler()
+
+    def stop(self):
+        if self._sampler is None:
+            return _status_mb('VmHWM')
+        return self._sampler.stop()
+
+
+def cpu_seconds():
+    """本进程及已结束子进程（如图表渲染的进程池）的 CPU 时间之和。"""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+def _diff(end, start):
+    return None if end is None or start is None else end - start
+
+
+class RunRecorder:
+    """逐阶段记录运行指标；profile_stage 指定的阶段额外开启 cProfile 与 tracemalloc。"""
+
+    def __init__(self, profile_stage=None, profile_dir='.'):
+        self.profile_stage = profile_stage
+        self.profile_dir = profile_dir
+        self.records = []
+        self._current = None
+        # VmHWM 会在每个阶段开始时被重置，进程峰值由各阶段峰值累计
+        self._process_peak = peak_rss_mb()
+
+    @classmethod
+    def from_env(cls, profile_dir='.'):
+        """从环境变量读取需要深度分析的阶段。"""
+        return cls(os.environ.get(PROFILE_STAGE_ENV) or None, profile_dir)
+
+    def _is_profiled(self, stage, name):
+        return self.profile_stage is not None and self.profile_stage in (str(stage), name)
+
+    def begin(self, stage, name=''):
+        """开始一个阶段；上一个阶段未结束时先结束它。"""
+        if self._current is not None:
+            self.end()
+        record = {'stage': str(stage), 'name': name, 'rows': None,
+                  'rss_start_mb': current_rss_mb(), 'tracemalloc_peak_mb': None}
+        profiler = None
+        if self._is_profiled(stage, name):
+            tracemalloc.start()
+            profiler = cProfile.Profile()
+            profiler.enable()
+        self._current = (record, profiler, StagePeak(), time.perf_counter(), cpu_seconds())
+        return record
+
+    def end(self, rows=None):
+        """结束当前阶段并记录指标，返回该阶段的记录。"""
+        record, profiler, stage_peak, wall_start, cpu_start = self._current
+        self._current = None
+        record['wall_seconds'] = time.perf_counter() - wall_start
+        record['cpu_seconds'] = cpu_seconds() - cpu_start
+        if rows is not None:
+            record['rows'] = int(rows)
+        if profiler is not None:
+            profiler.disable()
+            record['tracemalloc_peak_mb'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+            self._dump_profile(profiler, record['stage'])
+        record['rss_end_mb'] = current_rss_mb()
+        record['peak_rss_mb'] = stage_peak.stop()
+        record['peak_delta_mb'] = _diff(record['peak_rss_mb'], record['rss_start_mb'])
+        if record['peak_rss_mb'] is not None:
+            self._process_peak = max(self._process_peak or 0.0, record['peak_rss_mb'])
+        record['process_peak_rss_mb'] = self._process_peak
+        self.records.append(record)
+        return record
+
+    @contextmanager
+    def stage(self, stage, name='', rows=None):
+        """上下文管理器形式；可在块内设置 record['rows']。"""
+        record = self.begin(stage, name)
+        try:
+            yield record
+        finally:
+            self.end(rows if rows is not None else record['rows'])
+
+    def _dump_profile(self, profiler, stage):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f'profile_{stage}.prof')
+        profiler.dump_stats(path)
+        with open(os.path.join(self.profile_dir, f'profile_{stage}.txt'), 'w',
+                  encoding='utf-8') as f:
+            pstats.Stats(profiler, stream=f).sort_stats('cumulative').print_stats(40)
+
+    def environment(self):
+        return {'python': platform.python_version(), 'platform': platform.platform(),
+                'cpu_count': os.cpu_count(), 'profile_stage': self.profile_stage}
+
+    def write(self, directory, basename='run_log'):
+        """写出 JSON 与 CSV 运行日志，返回 (json路径, csv路径)。"""
+        json_path = os.path.join(directory, f'{basename}.json')
+        csv_path = os.path.join(directory, f'{basename}.csv')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({'environment': self.environment(), 'stages': self.records}, f,
+                      ensure_ascii=False, indent=2)
+        with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=RUN_LOG_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.records)
+        return json_path, csv_path
+
+    def summary_lines(self):
+        """控制台输出用的每阶段一行摘要。"""
+        for record in self.records:
+            rows = f"{record['rows']:,} 行" if record['rows'] is not None else ''
+            peak = record['peak_delta_mb']
+            peak_text = f"+{peak:,.0f} MB" if peak is not None else '-'
+            yield (f"  {record['stage']:>6} {record['name']:<14} {record['wall_seconds']:>8.2f} 秒"
+                   f"  CPU {record['cpu_seconds']:>7.2f} 秒  峰值 {peak_text:>8}  {rows}")
@@ -0,0 +1,100 @@
+# ==============================
+# 流失率置信区间 - Wilson 区间与向量化 Bootstrap
+# ==============================
+#
+# 各章节打印的流失率都是点估计，小分组在不同月份快照之间波动很大。
+# 这里为每个分组的流失率给出区间估计：
+#   - Wilson 得分区间：闭式解，直接由客户数与流失数计算；
+#   - Bootstrap 百分位区间：不对行数据重复 groupby，而是对分组计数做 Poisson 重抽样
+#     （每个分组的留存数与流失数分别乘以 Poisson(1) 权重之和，即 Poisson(计数)），
+#     所有维度、所有分组、全部重复次数在一次 NumPy 调用中生成，
+#     开销只与 分组数 × 重复次数 有关，与行数无关。
+
+import math
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_LEVEL = 0.95
+DEFAULT_REPLICATES = 1000
+
+
+def _z_score(level):
+    """双侧置信水平对应的标准正态分位数（对 erf 二分求解，不依赖 scipy）。"""
+    target = 0.5 + level / 2
+    lo, hi = 0.0, 10.0
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if 0.5 * (1 + math.erf(mid / math.sqrt(2))) < target:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+def wilson_interval(churn, count, level=DEFAULT_LEVEL):
+    """流失率的 Wilson 得分区间，参数可以是标量或数组，返回 (下限, 上限)。"""
+    churn = np.asarray(churn, dtype=np.float64)
+    count = np.asarray(count, dtype=np.float64)
+    z = _z_score(level)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = churn / count
+        denom = 1 + z ** 2 / count
+        center = (p + z ** 2 / (2 * count)) / denom
+        half = z * np.sqrt(p * (1 - p) / count + z ** 2 / (4 * count ** 2)) / denom
+    return center - half, center + half
+
+
+def bootstrap_interval(churn, count, level=DEFAULT_LEVEL, replicates=DEFAULT_REPLICATES,
+                       seed=None):
+    """Poisson Bootstrap 百分位区间，所有分组一次批量重抽样，返回 (下限, 上限)。"""
+    churn = np.asarray(churn, dtype=np.float64)
+    count = np.asarray(count, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    # 形状 (重复次数, 2, 分组数)：第 0 行为留存数，第 1 行为流失数
+    sampled = rng.poisson(np.stack([count - churn, churn]), size=(replicates, 2, len(count)))
+    resampled_count = sampled.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rates = sampled[:, 1] / resampled_count
+    # 重抽样后分组为空的重复不参与分位数
+    rates[resampled_count == 0] = np.nan
+    tail = (1 - level) / 2
+    low, high = np.nanquantile(rates, [tail, 1 - tail], axis=0)
+    return low, high
+
+
+def with_intervals(tables, method='wilson', level=DEFAULT_LEVEL,
+                   replicates=DEFAULT_REPLICATES, seed=None):
+    """为多张 churn_table 结果追加 ci_low / ci_high 列。
+
+    tables 为 {维度: 表}，表的列为 [mean, count]（见 aggregate.churn_table）。
+    所有表的分组拼接后一次计算区间，返回结构相同的新字典。
+    """
+    names = list(tables)
+    counts = np.concatenate([tables[name]['count'].to_numpy() for name in names])
+    means = np.concatenate([tables[name]['mean'].to_numpy() for name in names])
+    churn = np.rint(means * counts)
+    if method == 'wilson':
+        low, high = wilson_interval(churn, counts, level)
+    elif method == 'bootstrap':
+        low, high = bootstrap_interval(churn, counts, level, replicates, seed)
+    else:
+        raise ValueError(f"未知的区间方法: {method}")
+
+    out, start = {}, 0
+    for name in names:
+        stop = start + len(tables[name])
+        table = tables[name].copy()
+        table['ci_low'] = low[start:stop]
+        table['ci_high'] = high[start:stop]
+        out[name] = table
+        start = stop
+    return out
+
+
+def format_rate(row, level=DEFAULT_LEVEL):
+    """格式化 “流失率: xx.x% (95% CI a%–b%)”，row 需包含 mean / ci_low / ci_high。"""
+    text = f"流失率: {row['mean'] * 100:.1f}%"
+    if 'ci_low' in row and pd.notna(row['ci_low']):
+        text += f" ({level:.0%} CI {row['ci_low'] * 100:.1f}%–{row['ci_high'] * 100:.1f}%)"
+    return text
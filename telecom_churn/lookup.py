@@ -0,0 +1,236 @@
+# ==============================
+# 客户查询索引 - 按 customerID 排序的内存映射记录
+# ==============================
+#
+# 处理后的数据只保存为CSV时，查询单个客户需要扫描整个文件。导出阶段额外写出一个
+# 按 customerID 排序的索引目录：
+#   - keys.npy：排序后的定长字节编号（ASCII 编号如 7590-VHVEG 每个只占10字节）；
+#   - records.npy：与 keys 同序的定长结构化记录（分类列存为编码，二元列为 0/1），
+#     附带流失概率、风险分层与在网时长分箱；
+#   - meta.json：行数、来源哈希、各分类列的取值、各细分维度的流失率。
+# 两个 .npy 都以 np.load(mmap_mode='r') 打开，查询时在 keys 上二分查找（O(log n)，
+# 只触及少数几页），命中后读取 records 中的一行；不加载整张表。
+# 批量查询先对编号排序再一次 searchsorted，相邻编号落在同一页上。
+#
+# 用法:
+#     python -m telecom_churn.lookup build WA_Fn-UseC_-Telco-Customer-Churn.csv customer_index --model churn_risk_model.json
+#     python -m telecom_churn.lookup query customer_index 7590-VHVEG 5575-GNVDE
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import _codes
+from .cube import TENURE_BAND
+from .schema import customer_id_keys
+from .scoring import RISK_BANDS, ChurnRiskModel, risk_band
+
+INDEX_VERSION = 1
+KEYS_FILE = 'keys.npy'
+RECORDS_FILE = 'records.npy'
+META_FILE = 'meta.json'
+# 查询结果中附带流失率的细分维度
+SEGMENT_DIMENSIONS = ['Contract', 'InternetService', 'PaymentMethod']
+RISK_LEVELS = [label for _, label in RISK_BANDS]
+
+
+def _code_dtype(n_levels):
+    return np.int8 if n_levels < 127 else np.int32
+
+
+def build_customer_index(df, directory, model=None):
+    """由清洗后的数据写出按 customerID 排序的查询索引，返回索引目录。
+
+    model 为 ChurnRiskModel 时记录每个客户的流失概率与风险分层。
+    """
+    os.makedirs(directory, exist_ok=True)
+    keys = customer_id_keys(df['customerID'].to_numpy())
+    # 稳定排序：重复编号时查询返回第一次出现的行
+    order = np.argsort(keys, kind='mergesort')
+
+    columns = {}
+    categories = {}
+    for col in df.columns:
+        if col == 'customerID':
+            continue
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            codes, levels = _codes(df[col])
+            categories[col] = [str(v) for v in levels]
+            columns[col] = codes.astype(_code_dtype(len(levels)))
+        else:
+            columns[col] = df[col].to_numpy()
+
+    if model is not None:
+        probability = model.score_frame(df)
+        columns['churn_probability'] = probability.astype(np.float32)
+        columns['risk_band'] = pd.Categorical(risk_band(probability),
+                                              categories=RISK_LEVELS).codes.astype(np.int8)
+        categories['risk_band'] = list(RISK_LEVELS)
+    columns['tenure_band'] = (df['tenure'].to_numpy() // TENURE_BAND * TENURE_BAND).astype(np.int16)
+
+    # 各细分维度每个取值的流失率，查询时按编码直接取值
+    churn = df['Churn'].to_numpy().astype(np.float64)
+    segment_rates = {}
+    for dim in SEGMENT_DIMENSIONS:
+        if dim not in categories:
+            continue
+        codes = columns[dim].astype(np.int64)
+        valid = codes >= 0
+        size = len(categories[dim])
+        count = np.bincount(codes[valid], minlength=size)
+        churned = np.bincount(codes[valid], weights=churn[valid], minlength=size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            segment_rates[dim] = [None if c == 0 else float(r)
+                                  for c, r in zip(count, churned / count)]
+
+    dtype = np.dtype([(col, values.dtype) for col, values in columns.items()])
+    records = np.lib.format.open_memmap(os.path.join(directory, RECORDS_FILE), mode='w+',
+                                        dtype=dtype, shape=(len(df),))
+    for col, values in columns.items():
+        records[col] = values[order]
+    records.flush()
+    del records
+    np.save(os.path.join(directory, KEYS_FILE), keys[order])
+
+    meta = {'version': INDEX_VERSION, 'n_rows': len(df),
+            'source_digest': df.attrs.get('source_digest'),
+            'categories': categories, 'segment_rates': segment_rates}
+    # meta.json 最后写入，作为索引已完整写出的标记
+    with open(os.path.join(directory, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return directory
+
+
+class CustomerIndex:
+    """按 customerID 查询清洗后的记录与所属细分的只读索引。"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != INDEX_VERSION:
+            raise ValueError(f"索引版本不兼容: {directory}")
+        self.keys = np.load(os.path.join(directory, KEYS_FILE), mmap_mode='r')
+        self.records = np.load(os.path.join(directory, RECORDS_FILE), mmap_mode='r')
+        self.categories = self.meta['categories']
+        self.segment_rates = self.meta['segment_rates']
+
+    def __len__(self):
+        return self.meta['n_rows']
+
+    def __contains__(self, customer_id):
+        return self._positions([customer_id])[0] >= 0
+
+    def _positions(self, customer_ids):
+        """二分查找各编号在索引中的位置，未找到为 -1。"""
+        queries = customer_id_keys(customer_ids)
+        width = self.keys.dtype.itemsize
+        # 超过索引编号宽度的查询不可能命中，不能截断后再比较
+        too_long = np.char.str_len(queries) > width if queries.dtype.itemsize > width else None
+        queries = queries.astype(self.keys.dtype)
+        # 查询按编号排序后再二分查找，相邻查询访问的是同一批页
+        order = np.argsort(queries, kind='mergesort')
+        positions = np.empty(len(queries), dtype=np.int64)
+        positions[order] = np.searchsorted(self.keys, queries[order])
+        inside = positions < len(self.keys)
+        found = np.zeros(len(queries), dtype=bool)
+        found[inside] = self.keys[positions[inside]] == queries[inside]
+        if too_long is not None:
+            found &= ~too_long
+        return np.where(found, positions, -1)
+
+    def _decode(self, record, customer_id):
+        out = {'customerID': customer_id}
+        for col in record.dtype.names:
+            value = record[col]
+            # float32 按最短十进制表示转换，避免 29.850000381469727 这样的尾数
+            value = float(str(value)) if value.dtype.kind == 'f' else value.item()
+            if col in self.categories:
+                value = self.categories[col][value] if value >= 0 else None
+            out[col] = value
+        return out
+
+    def lookup(self, customer_id):
+        """查询单个客户，返回记录字典（附 segments 细分信息）；不存在时返回 None。"""
+        position = self._positions([customer_id])[0]
+        if position < 0:
+            return None
+        record = self._decode(self.records[position], customer_id)
+        record['segments'] = self.segments(record)
+        return record
+
+    def segments(self, record):
+        """记录所属的细分：风险分层、在网时长分箱，以及各细分维度的取值与流失率。"""
+        out = {'risk_band': record.get('risk_band'), 'tenure_band': record['tenure_band']}
+        for dim, rates in self.segment_rates.items():
+            value = record[dim]
+            rate = rates[self.categories[dim].index(value)] if value is not None else None
+            out[dim] = {'value': value, 'churn_rate': rate}
+        return out
+
+    def lookup_many(self, customer_ids):
+        """批量查询，返回按查询顺序排列的 DataFrame（未找到的编号不出现在结果中）。
+
+        分类列恢复为 category 类型，并为各细分维度附加 <维度>_churn_rate 列。
+        """
+        customer_ids = np.asarray(customer_ids, dtype=object)
+        positions = self._positions(customer_ids)
+        hit = positions >= 0
+        # 按位置顺序读取记录，相邻客户落在同一页上
+        wanted = positions[hit]
+        order = np.argsort(wanted, kind='mergesort')
+        rows = np.empty(len(wanted), dtype=self.records.dtype)
+        rows[order] = self.records[wanted[order]]
+
+        out = pd.DataFrame({'customerID': customer_ids[hit]})
+        for col in rows.dtype.names:
+            if col in self.categories:
+                out[col] = pd.Categorical.from_codes(rows[col].astype(np.int64),
+                                                     categories=self.categories[col])
+            else:
+                out[col] = rows[col]
+        for dim, rates in self.segment_rates.items():
+            lookup = np.array([np.nan if r is None else r for r in rates] + [np.nan])
+            out[f'{dim}_churn_rate'] = lookup[rows[dim].astype(np.int64)]
+        return out
+
+
+def open_customer_index(directory):
+    return CustomerIndex(directory)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="电信客户流失分析 - 客户查询索引")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help="由原始CSV构建查询索引")
+    build.add_argument('path')
+    build.add_argument('index', help="索引目录")
+    build.add_argument('--model', default=None,
+                       help="流失风险模型文件（默认在数据上重新训练）")
+    query = sub.add_parser('query', help="按 customerID 查询")
+    query.add_argument('index', help="索引目录")
+    query.add_argument('customer_ids', nargs='+')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        from .validate import read_validated
+
+        df = read_validated(args.path)
+        model = ChurnRiskModel.load(args.model) if args.model else ChurnRiskModel.fit(df)
+        build_customer_index(df, args.index, model)
+        print(f"✅ 已为 {len(df):,} 名客户建立查询索引: {args.index}")
+    else:
+        index = open_customer_index(args.index)
+        for customer_id in args.customer_ids:
+            record = index.lookup(customer_id)
+            if record is None:
+                print(f"⚠️ 未找到客户: {customer_id}")
+                continue
+            print(json.dumps(record, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
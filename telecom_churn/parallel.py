@@ -0,0 +1,203 @@
+# ==============================
+# 多核分区并行执行
+# ==============================
+#
+# 输入按文件分区（例如按地区拆分的多个CSV），或把单个大文件按字节范围
+# 切成若干段（对齐到行边界）。每个工作进程对自己的分区流式计算一个
+# ChurnAccumulator（总体流失、各维度分组统计、在网时长曲线、月费分箱、
+# 相关系数矩阵），主进程按顺序合并后输出与单进程相同的报告和图表。
+# 各分区经过与单进程相同的数据质量校验。跨分区的重复编号先由各进程只读取
+# customerID 列得到每个分区的编号集合，并按编号哈希分成与进程数相同的若干份；
+# 每一份由一个进程独立求出每个分区“之前的分区中已出现过”的编号（同一编号总在同一份），
+# 主进程只转交数组、不做排序。各份结果拼接后作为该分区 Validator 的已见集合，
+# 因此保留的行与顺序处理完全一致。
+# 各分区的隔离文件按顺序合并为一个，source_row 为所有输入按顺序连续编号的行号。
+#
+# 用法:
+#     python -m telecom_churn.parallel region_*.csv --workers 32 --images-dir images
+#     python -m telecom_churn.parallel WA_Fn-UseC_-Telco-Customer-Churn.csv --workers 8
+
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .streaming import DEFAULT_CHUNKSIZE, ChurnAccumulator, iter_chunks, print_report
+from .validate import Validator, known_ids, merge_quarantine_files, read_ids, shard_ids
+
+
+def pool_context():
+    """进程池启动方式：优先 fork，spawn 会在子进程中重新执行主脚本的顶层代码。"""
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+class _RangeReader:
+    """只读取文件 [start, end) 字节范围的文件对象，供 pd.read_csv 分块读取。"""
+
+    def __init__(self, path, start, end):
+        self._file = open(path, 'rb')
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def __iter__(self):
+        # pandas 通过 read() 读取；提供迭代接口以满足文件对象检测
+        return iter(lambda: self.read(1 << 16), b'')
+
+    def close(self):
+        self._file.close()
+
+
+def split_byte_ranges(path, parts):
+    """把文件（除表头外）切成约 parts 段，每段起止都对齐到行首。
+
+    返回 (表头列名, [(start, end), ...])。
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        data_start = f.tell()
+        bounds = [data_start]
+        step = max((size - data_start) // parts, 1)
+        for i in range(1, parts):
+            target = data_start + i * step
+            if target <= bounds[-1]:
+                continue
+            f.seek(target)
+            f.readline()  # 跳到下一行行首
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+        bounds.append(size)
+    names = header.decode('utf-8').strip().split(',')
+    return names, list(zip(bounds[:-1], bounds[1:]))
+
+
+def _open_partition(path, byte_range, names):
+    """返回 (读取源, read_csv 参数)；字节范围分区没有表头，列名由调用方提供。"""
+    if byte_range is None:
+        return path, {}
+    return _RangeReader(path, *byte_range), {'names': names, 'header': None}
+
+
+def _accumulate(task, validator):
+    """流式校验并累加一个分区，返回该分区的 ChurnAccumulator。"""
+    path, byte_range, names, chunksize = task
+    acc = ChurnAccumulator()
+    source, read_kwargs = _open_partition(path, byte_range, names)
+    try:
+        for chunk in iter_chunks(source, chunksize, validator, **read_kwargs):
+            acc.update(chunk)
+    finally:
+        if source is not path:
+            source.close()
+    return acc
+
+
+def _ids_worker(job):
+    """工作进程：只读取一个分区的 customerID 列，返回去重后按哈希分成 shards 份的编号。"""
+    (path, byte_range, names, _), shards = job
+    source, read_kwargs = _open_partition(path, byte_range, names)
+    try:
+        return shard_ids(read_ids(source, **read_kwargs), shards)
+    finally:
+        if source is not path:
+            source.close()
+
+
+def _cross_partition_seen(pool, tasks, shards):
+    """各分区在之前的分区中已出现过的编号：读取与查重都按哈希分片在工作进程中并行完成。"""
+    sharded = list(pool.map(_ids_worker, [(task, shards) for task in tasks]))
+    # 第 j 份：各分区落在该份的编号，按分区顺序排列
+    known = list(pool.map(known_ids, [[ids[j] for ids in sharded] for j in range(shards)]))
+    return [np.concatenate([part[i] for part in known]) for i in range(len(tasks))]
+
+
+def _partition_worker(job):
+    """工作进程：以给定的已见编号校验并累加一个分区，校验结果记录在 acc.validation。"""
+    task, seen, quarantine_path = job
+    validator = Validator(quarantine_path=quarantine_path, seen=seen)
+    try:
+        acc = _accumulate(task, validator)
+    finally:
+        validator.close()
+    acc.validation = validator.report()
+    return acc
+
+
+def build_tasks(paths, workers, chunksize=DEFAULT_CHUNKSIZE):
+    """生成分区任务：多个文件按文件分区，单个文件按字节范围切分。"""
+    if len(paths) > 1 or workers <= 1:
+        return [(path, None, None, chunksize) for path in paths]
+    names, ranges = split_byte_ranges(paths[0], workers)
+    return [(paths[0], byte_range, names, chunksize) for byte_range in ranges]
+
+
+def run_partitioned(paths, workers=None, chunksize=DEFAULT_CHUNKSIZE, quarantine_path=None):
+    """并行校验、计算所有分区并合并，返回合并后的 ChurnAccumulator（校验结果在 acc.validation）。"""
+    workers = workers or os.cpu_count() or 1
+    tasks = build_tasks(paths, workers, chunksize)
+    context = pool_context()
+    total = ChurnAccumulator()
+    if workers == 1 or len(tasks) == 1 or context is None:
+        # 顺序执行时所有分区共用一个 Validator
+        validator = Validator(quarantine_path=quarantine_path)
+        try:
+            for task in tasks:
+                total.merge(_accumulate(task, validator))
+        finally:
+            validator.close()
+        total.validation = validator.report()
+        return total
+    parts = [None] * len(tasks)
+    if quarantine_path is not None:
+        parts = [f'{quarantine_path}.part{i}' for i in range(len(tasks))]
+    workers = min(workers, len(tasks))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        seen = _cross_partition_seen(pool, tasks, workers)
+        # map 保持任务顺序，合并结果与分区完成先后无关
+        offsets = []
+        for partial in pool.map(_partition_worker, zip(tasks, seen, parts)):
+            offsets.append(total.validation['rows'] if total.validation else 0)
+            total.merge(partial)
+    if quarantine_path is not None:
+        merge_quarantine_files(parts, offsets, quarantine_path)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="电信客户流失分析 - 多核分区并行")
+    parser.add_argument('paths', nargs='+', help="一个或多个分区CSV")
+    parser.add_argument('--workers', type=int, default=None, help="工作进程数（默认CPU核数）")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help="每个分块的行数")
+    parser.add_argument('--images-dir', default=None, help="指定后同时渲染全部图表到该目录")
+    parser.add_argument('--quarantine', default='quarantine.csv', help="隔离文件路径")
+    args = parser.parse_args(argv)
+
+    acc = run_partitioned(args.paths, args.workers, args.chunksize, args.quarantine)
+    print_report(acc, args.quarantine)
+    if args.images_dir:
+        from .charts import render_all
+
+        for name, seconds in render_all(acc.chart_data(), args.images_dir,
+                                        processes=args.workers).items():
+            print(f"  🖼️ {name}.png: {seconds:.2f} 秒")
+
+
+if __name__ == '__main__':
+    main()
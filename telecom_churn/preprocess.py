@@ -0,0 +1,67 @@
+# ==============================
+# 数据预处理 - 列定义与清洗逻辑
+# ==============================
+#
+# 主脚本与分块流式模式共用同一套清洗规则，保证两种模式结果一致。
+
+import numpy as np
+import pandas as pd
+
+# 二元分类变量映射为0/1
+BINARY_MAPPING = {'Yes': 1, 'No': 0, 'Female': 0, 'Male': 1}
+BINARY_COLUMNS = ['gender', 'Partner', 'Dependents', 'PhoneService',
+                  'PaperlessBilling', 'Churn']
+
+# 分析维度
+DEMOGRAPHIC_FEATURES = ['gender', 'SeniorCitizen', 'Partner', 'Dependents']
+SERVICE_FEATURES = ['PhoneService', 'MultipleLines', 'InternetService',
+                    'OnlineSecurity', 'OnlineBackup', 'DeviceProtection',
+                    'TechSupport', 'StreamingTV', 'StreamingMovies']
+# 'No internet service' 在服务分析中视为 'No'
+INTERNET_ADDONS = ['OnlineSecurity', 'OnlineBackup', 'DeviceProtection',
+                   'TechSupport', 'StreamingTV', 'StreamingMovies']
+CONTRACT_FEATURES = ['Contract', 'PaymentMethod']
+
+# 相关性分析使用的数值特征
+NUMERIC_FEATURES = ['tenure', 'MonthlyCharges', 'TotalCharges', 'SeniorCitizen',
+                    'gender', 'Partner', 'Dependents', 'PhoneService', 'PaperlessBilling']
+FINANCIAL_FEATURES = ['MonthlyCharges', 'TotalCharges', 'tenure']
+
+
+def fix_total_charges(df):
+    """TotalCharges 中的空格转为NaN，并用 月费 × 在网月数 填充。"""
+    if not pd.api.types.is_numeric_dtype(df['TotalCharges']):
+        df['TotalCharges'] = pd.to_numeric(df['TotalCharges'].replace(' ', np.nan),
+                                           errors='coerce')
+    missing_mask = df['TotalCharges'].isna()
+    df.loc[missing_mask, 'TotalCharges'] = (df.loc[missing_mask, 'MonthlyCharges']
+                                            * df.loc[missing_mask, 'tenure'])
+    return df
+
+
+def map_binary_columns(df):
+    """将二元分类变量转换为0/1（按类型模式读取时已是 int8，直接跳过）。"""
+    for col in BINARY_COLUMNS:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].map(BINARY_MAPPING)
+    return df
+
+
+def preprocess(df):
+    """原地完成 TotalCharges 修复与二元变量映射，返回同一个 DataFrame。"""
+    fix_total_charges(df)
+    map_binary_columns(df)
+    return df
+
+
+def service_view(df, feature):
+    """返回服务分析使用的列：附加服务中 'No internet service' 合并为 'No'。"""
+    col = df[feature]
+    if feature in INTERNET_ADDONS:
+        col = col.map(_collapse_no_internet)
+    return col
+
+
+def _collapse_no_internet(value):
+    # 对 category 列只会按类别调用一次
+    return 'No' if value == 'No internet service' else value
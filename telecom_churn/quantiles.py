@@ -0,0 +1,210 @@
+# ==============================
+# 分位数草图与等频分箱
+# ==============================
+#
+# 财务章节原来用 pd.cut(df['MonthlyCharges'], bins=10) 画“月费区间 vs 流失率”：
+# 需要整列在内存中求最小/最大值，等宽分箱在偏态的费用分布上各箱人数相差悬殊。
+# 这里用可合并的 KLL 分位数草图做等频分箱：
+#   - QuantileSketch：多层压缩器，第 h 层每个元素代表 2^h 个原始值；某层超过容量时
+#     排序后隔一个取一个提升到上一层。内存约为 3k 个浮点数，与行数无关，
+#     秩误差约为 1.7/k；两个草图逐层拼接后再压缩即可合并（分块、多进程、增量快照）；
+#   - ChurnBinner：每列维护“全部客户”和“流失客户”两个草图，一次遍历即可。
+#     分箱边界取全部客户的等分位点，每箱客户数与流失数由两个草图在边界处的
+#     累计分布相减得到，不需要第二次扫描数据。
+# 压缩时的随机偏移使用固定种子，同样的输入得到同样的分箱。
+#
+# 用法:
+#     python -m telecom_churn.quantiles WA_Fn-UseC_-Telco-Customer-Churn.csv --bins 10 --chunksize 500000
+
+import argparse
+import math
+
+import numpy as np
+import pandas as pd
+
+BINNING_COLUMNS = ['MonthlyCharges', 'TotalCharges', 'tenure']
+DEFAULT_K = 2048
+DEFAULT_BINS = 10
+# 相邻层的容量比例（KLL 论文中的 c）
+COMPACTION_RATIO = 2 / 3
+BINNING_CHUNK_ROWS = 100_000
+
+
+class QuantileSketch:
+    """可合并的 KLL 分位数草图；最小值与最大值精确记录。"""
+
+    def __init__(self, k=DEFAULT_K, seed=0):
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.levels = [np.zeros(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * COMPACTION_RATIO ** depth)))
+
+    def _compress(self):
+        """压缩所有超过容量的层，直到每层都不超过容量。"""
+        while True:
+            full = [h for h, items in enumerate(self.levels) if len(items) > self._capacity(h)]
+            if not full:
+                return
+            h = full[0]
+            if h + 1 == len(self.levels):
+                self.levels.append(np.zeros(0))
+            items = np.sort(self.levels[h])
+            # 奇数个元素时最大的一个留在本层，其余两两一组，每组随机保留一个提升到上一层
+            keep = len(items) % 2
+            promoted = items[int(self._rng.integers(2)):len(items) - keep:2]
+            self.levels[h] = items[len(items) - keep:]
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+
+    def update(self, values):
+        """加入一批数值（忽略缺失值）。"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """合并另一个草图（逐层拼接后压缩）。"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.zeros(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _weighted(self):
+        """排序后的元素与累计权重（总权重等于 n）。"""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype=np.int64)
+                                  for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='mergesort')
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs):
+        """各分位点（0..1）的估计值；0 与 1 返回精确的最小值与最大值。"""
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        items, cumulative = self._weighted()
+        position = np.searchsorted(cumulative, qs * cumulative[-1], side='left')
+        out = items[np.minimum(position, len(items) - 1)]
+        out = np.where(qs <= 0, self.min, out)
+        return np.where(qs >= 1, self.max, out)
+
+    def cdf(self, values):
+        """不超过各值的数据个数的估计值。"""
+        if self.n == 0:
+            return np.zeros(np.shape(values))
+        items, cumulative = self._weighted()
+        cumulative = np.concatenate([[0], cumulative])
+        return cumulative[np.searchsorted(items, values, side='right')].astype(np.float64)
+
+
+class ChurnBinner:
+    """各数值列的全部客户 / 流失客户分位数草图，用于等频分箱的流失率曲线。"""
+
+    def __init__(self, columns=BINNING_COLUMNS, k=DEFAULT_K):
+        self.columns = list(columns)
+        self.sketches = {col: (QuantileSketch(k, seed=0), QuantileSketch(k, seed=1))
+                         for col in self.columns}
+
+    @classmethod
+    def from_columns(cls, columns, names=BINNING_COLUMNS, chunk_rows=BINNING_CHUNK_ROWS,
+                     k=DEFAULT_K):
+        """按块遍历列存储（或任何可按列名取数组的对象），内存占用与行数无关。"""
+        binner = cls(names, k)
+        n = len(columns['Churn'])
+        for start in range(0, n, chunk_rows):
+            binner.update({col: columns[col][start:start + chunk_rows]
+                           for col in list(names) + ['Churn']})
+        return binner
+
+    def update(self, frame):
+        """加入一个分块（DataFrame 或 列名 -> 数组 的映射，需包含 Churn）。"""
+        churned = np.asarray(frame['Churn']).astype(bool)
+        for col in self.columns:
+            values = np.asarray(frame[col], dtype=np.float64)
+            every, churn = self.sketches[col]
+            every.update(values)
+            churn.update(values[churned])
+        return self
+
+    def merge(self, other):
+        for col in self.columns:
+            for mine, theirs in zip(self.sketches[col], other.sketches[col]):
+                mine.merge(theirs)
+        return self
+
+    def edges(self, column, bins=DEFAULT_BINS, decimals=2):
+        """等频分箱边界（全部客户的等分位点，去重后按 decimals 取整）。"""
+        every = self.sketches[column][0]
+        edges = every.quantiles(np.linspace(0, 1, bins + 1))
+        edges = np.unique(np.round(edges, decimals))
+        if len(edges) == 1:
+            edges = np.array([edges[0], edges[0]])
+        if np.array_equal(edges, np.round(edges)):
+            # 整数列（在网时长）的区间标签显示为整数
+            edges = edges.astype(np.int64)
+        return edges
+
+    def churn_by_bins(self, column, bins=DEFAULT_BINS):
+        """每个等频分箱的客户数、流失数与流失率；索引为右闭区间（第一个区间包含最小值）。"""
+        edges = self.edges(column, bins)
+        every, churn = self.sketches[column]
+        # 第一个区间包含最小值：各箱计数为右边界处累计分布的差分
+        count = np.diff(np.concatenate([[0.0], every.cdf(edges[1:])]))
+        churned = np.diff(np.concatenate([[0.0], churn.cdf(edges[1:])]))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rate = churned / count
+        index = pd.IntervalIndex.from_breaks(edges, closed='right', name=column)
+        return pd.DataFrame({'count': np.rint(count).astype(np.int64),
+                             'churn': np.rint(churned).astype(np.int64), 'rate': rate},
+                            index=index)
+
+    def churn_curve(self, column, bins=DEFAULT_BINS):
+        """等频分箱的流失率曲线（图表输入），结构与 groupby(pd.cut(...))['Churn'].mean() 相同。"""
+        return self.churn_by_bins(column, bins)['rate'].rename('Churn')
+
+
+def format_bins(table):
+    """分箱流失率表格式化为控制台输出的文本行。"""
+    for interval, row in table.iterrows():
+        yield f"  {interval}: {int(row['count']):,} 客户, 流失率: {row['rate'] * 100:.1f}%"
+
+
+def main(argv=None):
+    # streaming 的累加器在模块顶层导入本模块，这里延迟导入避免循环引用
+    from .streaming import DEFAULT_CHUNKSIZE, iter_chunks
+
+    parser = argparse.ArgumentParser(description="电信客户流失分析 - 等频分箱流失率")
+    parser.add_argument('input', help="原始CSV路径")
+    parser.add_argument('--bins', type=int, default=DEFAULT_BINS, help="分箱数")
+    parser.add_argument('--k', type=int, default=DEFAULT_K, help="草图精度参数（越大越精确）")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="每个分块的行数")
+    args = parser.parse_args(argv)
+
+    binner = ChurnBinner(k=args.k)
+    for chunk in iter_chunks(args.input, args.chunksize):
+        binner.update(chunk)
+    for col in binner.columns:
+        print(f"\n📊 {col} 等频分箱流失率:")
+        for line in format_bins(binner.churn_by_bins(col, args.bins)):
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
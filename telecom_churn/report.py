@@ -0,0 +1,608 @@
+# ==============================
+# 电信客户流失分析 - 多维度分析报告（章节流水线）
+# ==============================
+#
+# 原主脚本的各章节整理为函数，导入本模块不会读取数据、创建目录或加载绘图库。
+# 章节之间共享的中间结果（清洗后的数据、多维度聚合表、置信区间、细分立方体、
+# 风险模型）放在 ReportContext 中按需计算并缓存，因此可以只运行部分章节；
+# 其它服务也可以直接在进程内使用 ReportContext 取得聚合结果。
+# matplotlib / seaborn 只在渲染图表时导入，仅统计数字的运行（--numbers-only）不加载绘图库。
+#
+# 用法:
+#     python -m telecom_churn WA_Fn-UseC_-Telco-Customer-Churn.csv --output-dir output
+#     python -m telecom_churn WA_Fn-UseC_-Telco-Customer-Churn.csv --sections 3-6 --numbers-only
+
+import argparse
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import ANALYSIS_DIMENSIONS, aggregate_dimensions, churn_table
+from .cache import load_processed
+from .colstore import ensure_column_store
+from .correlation import CorrelationAccumulator
+from .cube import CUBE_FILENAME, SegmentCube
+from .density import class_histogram, class_histogram2d
+from .export import (COMPRESSIONS, EXPORT_FORMATS, PARTITION_COLUMNS, check_options,
+                     export_frame)
+from .importance import feature_importance, format_importance
+from .instrument import PROFILE_STAGE_ENV, RunRecorder
+from .intervals import format_rate, wilson_interval, with_intervals
+from .lookup import build_customer_index
+from .preprocess import DEMOGRAPHIC_FEATURES, NUMERIC_FEATURES, SERVICE_FEATURES
+from .quantiles import ChurnBinner, format_bins
+from .scoring import RISK_BANDS, ChurnRiskModel, risk_band, roc_auc
+from .summary import SUMMARY_FORMATS, build_summary, render_console, write_summary
+from .survival import OVERALL, RETENTION_MONTHS, RetentionCurves
+from .validate import validation_lines
+
+DEFAULT_INPUT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'WA_Fn-UseC_-Telco-Customer-Churn.csv')
+DEFAULT_OUTPUT_DIR = '.'
+DEFAULT_SUMMARY_FORMATS = ('text', 'json')
+
+# 客户数超过该阈值时，财务章节的“在网时长 vs 总费用”散点图改为预分箱密度图
+FINANCIAL_DENSITY_THRESHOLD = 50_000
+# 财务章节打印的等频分箱数（图表中的月费流失率曲线为10个分箱）
+CHARGE_BINS = 5
+
+
+def _banner(title, leading_newline=True):
+    print(("\n" if leading_newline else "") + "=" * 50)
+    print(title)
+    print("=" * 50)
+
+
+class ReportContext:
+    """一次报告运行的输入、输出路径与按需计算的中间结果。"""
+
+    def __init__(self, input_path=DEFAULT_INPUT, output_dir=DEFAULT_OUTPUT_DIR,
+                 numbers_only=False, export_format='csv', export_compression=None,
+                 partition_by=None, summary_formats=DEFAULT_SUMMARY_FORMATS):
+        self.input_path = input_path
+        self.output_dir = output_dir
+        self.images_dir = os.path.join(output_dir, 'images')
+        self.cache_dir = os.path.join(output_dir, '.cache')
+        # 数据质量校验未通过的行（附原因代码）
+        self.quarantine_path = os.path.join(output_dir, 'quarantine.csv')
+        self.numbers_only = numbers_only
+        # 第10章导出处理后数据的格式、压缩方式与分区列
+        self.export_format = export_format
+        self.export_compression = export_compression
+        self.partition_by = partition_by
+        # 分析摘要的输出格式（text / json / html）
+        self.summary_formats = summary_formats
+        # 图表在所有章节完成后统一渲染，各章节只负责计算图表所需的聚合结果
+        self.chart_data = {}
+        self.cache_hit = None
+        self.run_log = None
+        self._cache = {}
+
+    def _get(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    @property
+    def df(self):
+        """清洗后的数据（按类型模式读取；原始CSV未变化时直接读取预处理缓存）。"""
+        def load():
+            df, self.cache_hit = load_processed(self.input_path, cache_dir=self.cache_dir,
+                                                quarantine_path=self.quarantine_path)
+            return df
+        return self._get('df', load)
+
+    @property
+    def columns(self):
+        """tenure / MonthlyCharges / TotalCharges / Churn 的内存映射列存储。"""
+        return self._get('columns', lambda: ensure_column_store(self.input_path, self.df,
+                                                                cache_dir=self.cache_dir))
+
+    @property
+    def churn_agg(self):
+        """所有分析维度的客户数与流失数（一次遍历）。"""
+        return self._get('churn_agg', lambda: aggregate_dimensions(self.df, ANALYSIS_DIMENSIONS))
+
+    @property
+    def rate_tables(self):
+        """各维度流失率表，附 95% Bootstrap 置信区间（所有分组一次批量重抽样）。"""
+        return self._get('rate_tables', lambda: with_intervals(
+            {feature: churn_table(self.churn_agg, feature)
+             for feature in ANALYSIS_DIMENSIONS if feature != 'tenure'},
+            method='bootstrap', seed=42))
+
+    @property
+    def segment_cube(self):
+        """所有分类维度 + 分箱在网时长/月费的细分立方体。"""
+        return self._get('segment_cube', lambda: SegmentCube.from_frame(self.df))
+
+    @property
+    def charge_bins(self):
+        """月费 / 总费用 / 在网时长的分位数草图（按块遍历列存储一次），用于等频分箱。"""
+        return self._get('charge_bins', lambda: ChurnBinner.from_columns(self.columns))
+
+    @property
+    def retention(self):
+        """整体与按合同类型、互联网服务、支付方式分层的 Kaplan-Meier 留存曲线。"""
+        return self._get('retention', lambda: RetentionCurves.from_frame(self.df))
+
+    @property
+    def risk_model(self):
+        """在清洗后的数据上训练的流失风险模型。"""
+        return self._get('risk_model', lambda: ChurnRiskModel.fit(self.df))
+
+    @property
+    def risk_summary(self):
+        """风险模型的训练集 AUC 与当前在网的高风险客户数。"""
+        def compute():
+            churn_probability = self.risk_model.score_frame(self.df)
+            churn = self.df['Churn'].to_numpy()
+            return {'auc': float(roc_auc(self.df['Churn'], churn_probability)),
+                    'threshold': RISK_BANDS[-2][0],
+                    'active_high_risk': int(((risk_band(churn_probability) == 'high')
+                                             & (churn == 0)).sum())}
+        return self._get('risk_summary', compute)
+
+    @property
+    def summary(self):
+        """由聚合结果生成的分析摘要（第9章控制台输出与 analysis_summary 文件共用）。"""
+        return self._get('summary', lambda: build_summary(
+            self.churn_agg, self.segment_cube, self.retention, self.risk_summary))
+
+    @property
+    def total_customers(self):
+        return len(self.df)
+
+    @property
+    def churn_count(self):
+        return self._get('churn_count', lambda: int(self.df['Churn'].sum()))
+
+    @property
+    def churn_rate(self):
+        """总体流失率（百分比）。"""
+        return self.churn_count / self.total_customers * 100
+
+
+# ==============================
+# 1. 数据加载与初步探索
+# ==============================
+
+def section_load(ctx):
+    _banner("电信客户流失分析 - 多维度分析报告", leading_newline=False)
+
+    # 加载数据（按类型模式读取：分类变量为category，二元变量为int8，费用为float32）
+    # 清洗结果缓存为列式文件，原始CSV未变化时直接内存映射读取，跳过解析与清洗
+    df = ctx.df
+    print("⚡ 命中预处理缓存" if ctx.cache_hit else "📥 已解析原始CSV并写入预处理缓存")
+
+    # 初步数据探索
+    print("\n📊 数据集概览:")
+    print(f"数据形状: {df.shape}")
+    print(f"行数: {df.shape[0]}, 列数: {df.shape[1]}")
+
+    print("\n📋 数据列信息:")
+    print(df.info())
+
+    print("\n🔍 数据描述性统计:")
+    print(df.describe())
+
+    print("\n🔍 分类变量概览:")
+    categorical_cols = df.select_dtypes(include=['object', 'category']).columns
+    for col in categorical_cols:
+        print(f"{col}: {df[col].nunique()} 个唯一值")
+    return len(df)
+
+
+# ==============================
+# 2. 数据预处理
+# ==============================
+
+def section_preprocess(ctx):
+    _banner("数据预处理阶段")
+    df = ctx.df
+
+    # 2.1 数据质量校验：读取原始数据时按声明式规则一次向量化检查，问题行写入隔离文件
+    validation = df.attrs.get('validation')
+    if validation is not None:
+        print(f"\n🔎 数据质量校验: {validation['rows']:,} 行，"
+              f"隔离 {validation['quarantined']:,} 行 → {ctx.quarantine_path}")
+        for line in validation_lines(validation):
+            print(line)
+
+    # 2.2 处理缺失值和异常值
+    print("\n🔧 处理缺失值...")
+    print(f"TotalCharges 缺失值数量: {df.attrs['total_charges_missing']}")
+
+    # TotalCharges中的空格已由解析器识别为缺失值，并在读取时使用月费乘以在网月数填充
+    print(f"处理后缺失值数量: {df['TotalCharges'].isna().sum()}")
+
+    # 2.3 数据类型转换
+    # 二元分类变量在读取时已直接解析为0/1 (int8)，无需再做映射
+
+    # 2.4 数值列存储：tenure / MonthlyCharges / TotalCharges / Churn 写成内存映射数组，
+    # 财务与相关性章节直接使用零拷贝视图，多个分析进程共享同一份页缓存
+    ctx.columns  # 首次访问时写出（或复用）列存储
+
+    print("\n✅ 数据预处理完成!")
+    return len(df)
+
+
+# ==============================
+# 3. 客户流失总体分析
+# ==============================
+
+def section_overview(ctx):
+    _banner("客户流失总体分析")
+    total_customers = ctx.total_customers
+    churn_count = ctx.churn_count
+    churn_rate = ctx.churn_rate
+
+    print(f"📈 总体流失分析:")
+    print(f"总客户数: {total_customers:,}")
+    print(f"流失客户数: {churn_count:,}")
+    churn_ci_low, churn_ci_high = wilson_interval(churn_count, total_customers)
+    print(f"流失率: {churn_rate:.2f}% (95% CI {churn_ci_low * 100:.2f}%–{churn_ci_high * 100:.2f}%)")
+    print(f"留存客户数: {total_customers - churn_count:,}")
+    print(f"留存率: {100 - churn_rate:.2f}%")
+
+    # 在网时长留存曲线：在网时长为生存时间、流失为事件，未流失客户视为删失
+    retention = ctx.retention
+    overall = retention.retention(RETENTION_MONTHS).loc[OVERALL]
+    print("\n📈 在网时长留存率（Kaplan-Meier）:")
+    print("  " + ", ".join(f"{month}个月: {rate:.1%}" for month, rate in overall.items()))
+
+    # 流失分布与留存曲线（用于 churn_overview 与 retention_curves 图表）
+    ctx.chart_data['churn_overview'] = {
+        'churn_counts': [total_customers - churn_count, churn_count],
+        'retention': retention.curve(),
+    }
+    ctx.chart_data['retention_curves'] = retention.chart_data()
+    return total_customers
+
+
+# ==============================
+# 4. 人口统计特征分析
+# ==============================
+
+DEMOGRAPHIC_NAMES = {'gender': '性别', 'SeniorCitizen': '老年人', 'Partner': '伴侣',
+                     'Dependents': '家属'}
+
+
+def section_demographics(ctx):
+    _banner("人口统计特征分析")
+    rate_tables = ctx.rate_tables
+
+    # 各特征的客户数与流失率（用于 demographic_analysis 图表）
+    ctx.chart_data['demographic_analysis'] = {
+        'tables': {feature: rate_tables[feature] for feature in DEMOGRAPHIC_FEATURES}
+    }
+
+    print("\n📊 人口特征流失率统计:")
+    for feature in DEMOGRAPHIC_FEATURES:
+        churn_stats = rate_tables[feature]
+        print(f"\n{DEMOGRAPHIC_NAMES[feature]}:")
+        for val in churn_stats.index:
+            if feature == 'gender':
+                label = '男' if val == 1 else '女'
+            else:
+                label = '是' if val == 1 else '否'
+            print(f"  {label}: {churn_stats.loc[val, 'count']:,} 客户, {format_rate(churn_stats.loc[val])}")
+    return ctx.total_customers
+
+
+# ==============================
+# 5. 服务使用特征分析
+# ==============================
+
+def section_services(ctx):
+    _banner("服务使用特征分析")
+    rate_tables = ctx.rate_tables
+
+    # 分析每个服务的流失率（'No internet service' 并入 'No'，MultipleLines 去掉 'No phone service'）
+    ctx.chart_data['service_analysis'] = {
+        'tables': {feature: rate_tables[feature] for feature in SERVICE_FEATURES}
+    }
+
+    # 服务捆绑分析
+    print("\n🔍 互联网服务类型分析:")
+    internet_analysis = rate_tables['InternetService']
+    for service in internet_analysis.index:
+        count = internet_analysis.loc[service, 'count']
+        print(f"  {service}: {count:,} 客户, {format_rate(internet_analysis.loc[service])}")
+    return ctx.total_customers
+
+
+# ==============================
+# 6. 合同与支付方式分析
+# ==============================
+
+def section_contracts(ctx):
+    _banner("合同与支付方式分析")
+
+    # 合同类型与支付方式流失率（用于 contract_payment_analysis 图表）
+    contract_churn = ctx.rate_tables['Contract'].sort_values('mean')
+    payment_churn = ctx.rate_tables['PaymentMethod'].sort_values('mean')
+    ctx.chart_data['contract_payment_analysis'] = {'contract': contract_churn,
+                                                   'payment': payment_churn}
+
+    print("\n📊 合同类型详细分析:")
+    for contract in contract_churn.index:
+        count = contract_churn.loc[contract, 'count']
+        print(f"  {contract}: {count:,} 客户, {format_rate(contract_churn.loc[contract])}")
+
+    print("\n💳 支付方式详细分析:")
+    for method in payment_churn.index:
+        count = payment_churn.loc[method, 'count']
+        print(f"  {method}: {count:,} 客户, {format_rate(payment_churn.loc[method])}")
+    return ctx.total_customers
+
+
+# ==============================
+# 7. 财务指标分析
+# ==============================
+
+def section_financial(ctx):
+    _banner("财务指标分析")
+    columns = ctx.columns
+    churn_flag = columns['Churn']
+
+    if not ctx.numbers_only:
+        # 按留存/流失分类的月费与总费用直方图计数（一次 bincount，不复制各类别的列）
+        chart = {
+            'monthly_hist': class_histogram(columns['MonthlyCharges'], churn_flag, bins=30),
+            'total_hist': class_histogram(columns['TotalCharges'], churn_flag, bins=30),
+        }
+        # 月费区间与流失率关系：分位数草图给出的等频分箱，每个区间的客户数相近
+        chart['monthly_churn'] = ctx.charge_bins.churn_curve('MonthlyCharges')
+        if ctx.total_customers > FINANCIAL_DENSITY_THRESHOLD:
+            # 大数据量：在网时长 × 总费用预分箱，图表只绘制分箱计数
+            chart['density'] = class_histogram2d(columns['tenure'], columns['TotalCharges'],
+                                                 churn_flag)
+        else:
+            chart['scatter'] = (np.asarray(columns['tenure']),
+                                np.asarray(columns['TotalCharges']), np.asarray(churn_flag))
+        ctx.chart_data['financial_analysis'] = chart
+
+    # 财务指标统计
+    print("\n💰 财务指标统计:")
+    print(f"平均月费: ${columns['MonthlyCharges'].mean(dtype=np.float64):.2f}")
+    print(f"平均总费用: ${columns['TotalCharges'].mean(dtype=np.float64):.2f}")
+    print(f"平均在网时长: {columns['tenure'].mean(dtype=np.float64):.1f} 月")
+
+    print("\n💰 留存客户 vs 流失客户财务对比:")
+    # 按流失类别加权 bincount 求均值，直接作用于内存映射视图
+    class_counts = np.bincount(churn_flag, minlength=2)
+    churn_stats = pd.DataFrame({
+        col: np.bincount(churn_flag, weights=columns[col], minlength=2) / class_counts
+        for col in ['MonthlyCharges', 'TotalCharges', 'tenure']
+    })
+    for label, cls in (("留存客户:", 0), ("\n流失客户:", 1)):
+        print(label)
+        print(f"  平均月费: ${churn_stats.loc[cls, 'MonthlyCharges']:.2f}")
+        print(f"  平均总费用: ${churn_stats.loc[cls, 'TotalCharges']:.2f}")
+        print(f"  平均在网时长: {churn_stats.loc[cls, 'tenure']:.1f} 月")
+
+    # 等频分箱：每个区间的客户数相近，偏态的费用分布上比等宽分箱更能看出流失率的变化
+    for col, name in (('MonthlyCharges', '月费'), ('TotalCharges', '总费用'), ('tenure', '在网时长')):
+        print(f"\n📊 {name}等频分箱流失率:")
+        for line in format_bins(ctx.charge_bins.churn_by_bins(col, bins=CHARGE_BINS)):
+            print(line)
+    return ctx.total_customers
+
+
+# ==============================
+# 8. 多维度综合分析
+# ==============================
+
+def section_correlation(ctx):
+    _banner("多维度综合分析")
+
+    # 计算相关系数矩阵（用于 correlation_analysis 图表）
+    # 按行分块累积均值与离差叉积，不把十列整体转换为 float64
+    correlation = CorrelationAccumulator(NUMERIC_FEATURES + ['Churn']).update(ctx.df)
+    ctx.chart_data['correlation_analysis'] = {'correlation_matrix': correlation.matrix()}
+
+    # 特征重要性分析：所有分类变量与流失的列联表来自多维度聚合表，无需再扫描数据
+    ranking = feature_importance(ctx.churn_agg)
+    ctx.chart_data['feature_importance'] = {'ranking': ranking}
+    print("\n📊 分类特征与流失的关联强度（卡方检验 / Cramér's V / 互信息，按 Cramér's V 排序）:")
+    print(format_importance(ranking))
+    return ctx.total_customers
+
+
+# ==============================
+# 图表渲染（非交互式后端，进程池并行）
+# ==============================
+
+def render_charts(ctx):
+    _banner("图表渲染")
+    # 绘图库只在这里导入
+    from .charts import render_all
+
+    for name, seconds in render_all(ctx.chart_data, ctx.images_dir).items():
+        print(f"  🖼️ {name}.png: {seconds:.2f} 秒")
+
+
+# ==============================
+# 9. 业务洞察与建议
+# ==============================
+
+def section_insights(ctx):
+    _banner("业务洞察与建议")
+    # 关键发现、重点细分与建议由本次运行的聚合结果生成（细分排名、特征重要性、
+    # 细分立方体、留存曲线与风险评分），与 analysis_summary 使用同一份摘要
+    print(render_console(ctx.summary))
+    return ctx.total_customers
+
+
+# ==============================
+# 10. 数据导出
+# ==============================
+
+def section_export(ctx):
+    _banner("数据导出")
+    output_dir = ctx.output_dir
+
+    # 导出处理后的数据：分块写出，可压缩、可输出 Parquet、可按合同类型或互联网服务分区
+    output_data_path = os.path.join(output_dir, 'telecom_churn_processed')
+    files = export_frame(ctx.df, output_data_path, ctx.export_format, ctx.export_compression,
+                         ctx.partition_by)
+    if ctx.partition_by is None:
+        output_data_path = next(iter(files))
+        print(f"✅ 处理后的数据已保存为: {output_data_path}")
+    else:
+        print(f"✅ 处理后的数据已按 {ctx.partition_by} 分区保存到: {output_data_path}/")
+        for file_path, rows in sorted(files.items()):
+            print(f"   - {file_path}: {rows:,} 行")
+
+    # 导出分析摘要：文本 / JSON（可选 HTML）由同一份摘要按模板渲染
+    summary_paths = write_summary(ctx.summary, os.path.join(output_dir, 'analysis_summary'),
+                                  ctx.summary_formats)
+    summary_path = ', '.join(summary_paths)
+    print(f"✅ 分析摘要已保存为: {summary_path}")
+
+    # 导出流失风险模型，供 python -m telecom_churn.scoring score 对新数据评分
+    model_path = os.path.join(output_dir, 'churn_risk_model.json')
+    ctx.risk_model.save(model_path)
+    print(f"✅ 流失风险模型已保存为: {model_path}")
+
+    # 导出细分立方体，供 python -m telecom_churn.cube 做即席切片查询
+    cube_path = os.path.join(output_dir, CUBE_FILENAME)
+    ctx.segment_cube.save(cube_path)
+    print(f"✅ 细分立方体已保存为: {cube_path}（{len(ctx.segment_cube):,} 个单元）")
+
+    # 按 customerID 排序的客户查询索引，供 python -m telecom_churn.lookup 做单客户查询
+    index_path = build_customer_index(ctx.df, os.path.join(output_dir, 'customer_index'),
+                                      ctx.risk_model)
+    print(f"✅ 客户查询索引已保存到: {index_path}/")
+
+    # 列出所有保存的文件
+    print("\n📁 生成的文件:")
+    print(f"1. 处理后的数据: {output_data_path}")
+    print(f"2. 分析摘要: {summary_path}")
+    print(f"3. 细分立方体: {cube_path}")
+    print(f"4. 流失风险模型: {model_path}")
+    print(f"5. 客户查询索引: {index_path}/")
+    if os.path.isdir(ctx.images_dir):
+        print(f"6. 可视化图表:")
+        for file in os.listdir(ctx.images_dir):
+            if file.endswith('.png'):
+                print(f"   - {os.path.join(ctx.images_dir, file)}")
+    return len(ctx.df)
+
+
+# 章节编号 -> (名称, 函数)；图表渲染在第8章之后、第9章之前执行
+SECTIONS = {
+    '1': ('数据加载', section_load),
+    '2': ('数据预处理', section_preprocess),
+    '3': ('流失总体分析', section_overview),
+    '4': ('人口统计特征', section_demographics),
+    '5': ('服务使用特征', section_services),
+    '6': ('合同与支付方式', section_contracts),
+    '7': ('财务指标', section_financial),
+    '8': ('多维度综合', section_correlation),
+    '9': ('业务洞察', section_insights),
+    '10': ('数据导出', section_export),
+}
+RENDER_AFTER = 8
+
+
+def parse_sections(text):
+    """解析章节选择，例如 '1,3-6,10'；None 表示全部章节。"""
+    if not text:
+        return list(SECTIONS)
+    selected = set()
+    for part in text.split(','):
+        part = part.strip()
+        if '-' in part:
+            lo, hi = (int(v) for v in part.split('-', 1))
+            selected.update(str(i) for i in range(lo, hi + 1))
+        elif part:
+            selected.add(part)
+    unknown = selected - set(SECTIONS)
+    if unknown:
+        raise ValueError(f"未知的章节: {', '.join(sorted(unknown))}")
+    return [key for key in SECTIONS if key in selected]
+
+
+def _run_render(ctx, run_log):
+    run_log.begin('render', '图表渲染')
+    render_charts(ctx)
+    run_log.end()
+
+
+def run_report(input_path=DEFAULT_INPUT, output_dir=DEFAULT_OUTPUT_DIR, sections=None,
+               numbers_only=False, profile_stage=None, export_format='csv',
+               export_compression=None, partition_by=None,
+               summary_formats=DEFAULT_SUMMARY_FORMATS):
+    """按顺序运行选定的章节，写出运行日志，返回 ReportContext。"""
+    os.makedirs(output_dir, exist_ok=True)
+    ctx = ReportContext(input_path, output_dir, numbers_only=numbers_only,
+                        export_format=export_format, export_compression=export_compression,
+                        partition_by=partition_by, summary_formats=summary_formats)
+    # 各章节的耗时、CPU时间、内存与行数记录到运行日志；
+    # profile_stage 指定的章节额外开启 cProfile 与 tracemalloc
+    if profile_stage is None:
+        profile_stage = os.environ.get(PROFILE_STAGE_ENV) or None
+    run_log = RunRecorder(profile_stage, profile_dir=output_dir)
+
+    # 图表在第8章之后、第9章之前统一渲染；未选第9、10章时在最后渲染
+    rendered = numbers_only
+    for key in sections or list(SECTIONS):
+        if not rendered and int(key) > RENDER_AFTER and ctx.chart_data:
+            _run_render(ctx, run_log)
+            rendered = True
+        name, section = SECTIONS[key]
+        run_log.begin(key, name)
+        run_log.end(rows=section(ctx))
+    if not rendered and ctx.chart_data:
+        _run_render(ctx, run_log)
+
+    # 运行日志：各阶段耗时、CPU时间、内存与行数（与分析摘要同目录）
+    run_log_json, run_log_csv = run_log.write(output_dir)
+    print("\n⏱️ 各阶段运行指标:")
+    for line in run_log.summary_lines():
+        print(line)
+    print(f"✅ 运行日志已保存为: {run_log_json} / {run_log_csv}")
+
+    print(f"\n🎉 分析完成! 所有文件已保存到: {output_dir}")
+    ctx.run_log = run_log
+    return ctx
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="电信客户流失分析 - 多维度分析报告")
+    parser.add_argument('input', nargs='?', default=DEFAULT_INPUT, help="原始CSV路径")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help="输出目录（处理后数据、摘要、图表、运行日志）")
+    parser.add_argument('--sections', default=None,
+                        help="要运行的章节，例如 '3-8' 或 '1,3,9'（默认全部）")
+    parser.add_argument('--numbers-only', action='store_true',
+                        help="只计算和输出统计数字，不生成图表（不加载绘图库）")
+    parser.add_argument('--profile-stage', default=None,
+                        help=f"对该章节开启 cProfile 与 tracemalloc（也可用环境变量 {PROFILE_STAGE_ENV}）")
+    parser.add_argument('--export-format', default='csv', choices=EXPORT_FORMATS,
+                        help="处理后数据的导出格式")
+    parser.add_argument('--export-compression', default=None, choices=COMPRESSIONS,
+                        help="CSV 导出的压缩方式（Parquet 默认 snappy）")
+    parser.add_argument('--partition-by', default=None, choices=PARTITION_COLUMNS,
+                        help="按该列分区导出处理后数据")
+    parser.add_argument('--summary-formats', nargs='+', default=list(DEFAULT_SUMMARY_FORMATS),
+                        choices=SUMMARY_FORMATS, help="分析摘要的输出格式")
+    args = parser.parse_args(argv)
+
+    try:
+        sections = parse_sections(args.sections)
+        check_options(args.export_format, args.export_compression, args.partition_by)
+    except ValueError as exc:
+        parser.error(str(exc))
+    warnings.filterwarnings('ignore')
+    run_report(args.input, args.output_dir, sections, args.numbers_only, args.profile_stage,
+               args.export_format, args.export_compression, args.partition_by,
+               args.summary_formats)
+
+
+if __name__ == '__main__':
+    main()
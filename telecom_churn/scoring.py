@@ -0,0 +1,295 @@
+# ==============================
+# 流失风险评分 - 向量化逻辑回归
+# ==============================
+#
+# 在预处理后的数据上用 NumPy 训练 L2 正则化的逻辑回归（牛顿法 / IRLS）：
+# 分类变量独热编码，数值与二元变量标准化。设计矩阵按行分块构造、逐块累加梯度与 Hessian，
+# 训练内存与数据行数无关（千万行以上也可在全量数据上训练）。模型以 JSON 保存，评分时不再重跑分析。
+#
+# 评分不构造独热矩阵：每个分类列的系数表按类别编码直接取值（一次 take），
+# 数值列做一次矩阵乘法，批量接口每秒可处理数百万行；
+# 微批接口直接接收记录字典（例如挽留团队队列中的消息），不经过 pandas。
+#
+# 用法:
+#     python -m telecom_churn.scoring train WA_Fn-UseC_-Telco-Customer-Churn.csv --model churn_risk_model.json
+#     python -m telecom_churn.scoring score new_customers.csv --model churn_risk_model.json --output scores.csv
+
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from .preprocess import BINARY_COLUMNS, BINARY_MAPPING
+from .schema import CATEGORICAL_COLUMNS
+
+MODEL_VERSION = 1
+# 训练时设计矩阵每块的行数：内存只与块大小和特征数有关，不随数据行数增长
+FIT_CHUNK_ROWS = 1 << 18
+
+SCORING_CATEGORICALS = list(CATEGORICAL_COLUMNS)
+SCORING_NUMERICS = (['tenure', 'MonthlyCharges', 'TotalCharges', 'SeniorCitizen']
+                    + [col for col in BINARY_COLUMNS if col != 'Churn'])
+
+# 风险分层阈值：概率 < 0.3 为低风险，< 0.6 为中风险，其余为高风险
+RISK_BANDS = [(0.3, 'low'), (0.6, 'medium'), (1.0, 'high')]
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+def _code_lookup(col, levels):
+    """返回 (原始编码, 查找表)：lookup[原始编码] 为按模型类别顺序的编码，未知类别与缺失值为 -1。"""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        # 只对类别表做一次映射，再按编码取值
+        lookup = np.array([levels.index(v) if v in levels else -1
+                           for v in col.cat.categories] + [-1], dtype=np.int64)
+        return col.cat.codes.to_numpy(), lookup
+    lookup = np.append(np.arange(len(levels), dtype=np.int64), -1)
+    return pd.Categorical(col, categories=levels).codes, lookup
+
+
+def _category_codes(col, levels):
+    """按模型的类别顺序编码；训练时未出现的类别编码为 -1。"""
+    codes, lookup = _code_lookup(col, levels)
+    return lookup[codes]
+
+
+def _mean_std(x, chunk_rows):
+    """分块两遍计算均值与总体标准差（float64 累加），不创建整列的 float64 副本。"""
+    n = len(x)
+    total = sum(np.sum(x[i:i + chunk_rows], dtype=np.float64) for i in range(0, n, chunk_rows))
+    mean = total / n
+    squares = sum(np.sum(np.square(x[i:i + chunk_rows] - mean))
+                  for i in range(0, n, chunk_rows))
+    return mean, float(np.sqrt(squares / n))
+
+
+def roc_auc(y, scores):
+    """按秩计算 ROC AUC（Mann-Whitney U），并列分数取平均秩。"""
+    y = np.asarray(y).astype(bool)
+    ranks = pd.Series(scores).rank().to_numpy()
+    n_pos = y.sum()
+    n_neg = len(y) - n_pos
+    return (ranks[y].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+
+
+class ChurnRiskModel:
+    """逻辑回归流失风险模型：截距、数值列系数与各分类列的逐类别系数表。"""
+
+    def __init__(self, intercept, numeric, categorical):
+        # numeric: {列: (均值, 标准差, 系数)}；categorical: {列: {类别: 系数}}
+        self.intercept = float(intercept)
+        self.numeric = {col: tuple(map(float, v)) for col, v in numeric.items()}
+        self.categorical = {col: {k: float(w) for k, w in table.items()}
+                            for col, table in categorical.items()}
+        self._prepare()
+
+    def _prepare(self):
+        """把系数整理成数组，供批量评分使用。"""
+        self._num_cols = list(self.numeric)
+        stats = np.array([self.numeric[c] for c in self._num_cols]).reshape(-1, 3)
+        self._mean, self._std, self._coef = stats[:, 0], stats[:, 1], stats[:, 2]
+        # 标准化并入系数: (x - mean) / std * w = x * (w / std) - mean * w / std
+        self._scaled = self._coef / self._std
+        self._offset = self.intercept - float(np.dot(self._mean, self._scaled))
+        self._levels = {col: list(table) for col, table in self.categorical.items()}
+        # 每张系数表末尾追加 0，未知类别（编码 -1）取到它
+        self._tables = {col: np.append(np.array(list(table.values())), 0.0)
+                        for col, table in self.categorical.items()}
+
+    # ------------------------------
+    # 训练
+    # ------------------------------
+
+    @classmethod
+    def fit(cls, df, target='Churn', l2=1.0, max_iter=25, tol=1e-8,
+            categoricals=SCORING_CATEGORICALS, numerics=SCORING_NUMERICS,
+            chunk_rows=FIT_CHUNK_ROWS):
+        """牛顿法拟合 L2 正则化逻辑回归（截距不做正则化）。
+
+        每次迭代按 chunk_rows 行分块构造设计矩阵（标准化数值列 + 独热编码），
+        逐块累加梯度 Xᵀ(p − y) 与 Hessian XᵀWX；全量数据只有一块时设计矩阵只构造一次。
+        """
+        n = len(df)
+        y = df[target].to_numpy()
+        numeric_stats, columns = [], []
+        for col in numerics:
+            x = df[col].to_numpy()
+            mean, std = _mean_std(x, chunk_rows)
+            numeric_stats.append((col, mean, std or 1.0))
+            columns.append(x)
+        levels, codes = {}, []
+        for col in categoricals:
+            levels[col] = [v.item() if isinstance(v, np.generic) else v
+                           for v in pd.unique(df[col].dropna())]
+            levels[col].sort(key=str)
+            codes.append(_code_lookup(df[col], levels[col]))
+        widths = [len(levels[col]) for col in categoricals]
+        n_features = 1 + len(numerics) + sum(widths)
+
+        def design(start, stop):
+            X = np.zeros((stop - start, n_features))
+            X[:, 0] = 1.0
+            for i, (x, (_, mean, std)) in enumerate(zip(columns, numeric_stats)):
+                X[:, 1 + i] = (x[start:stop] - mean) / std
+            pos = 1 + len(numerics)
+            for (raw, lookup), width in zip(codes, widths):
+                block = lookup[raw[start:stop]]
+                valid = np.flatnonzero(block >= 0)
+                X[valid, pos + block[valid]] = 1.0
+                pos += width
+            return X, y[start:stop].astype(np.float64)
+
+        bounds = [(i, min(i + chunk_rows, n)) for i in range(0, n, chunk_rows)]
+        cached = design(*bounds[0]) if len(bounds) == 1 else None
+        w = np.zeros(n_features)
+        penalty = np.full(n_features, l2)
+        penalty[0] = 0.0
+        for _ in range(max_iter):
+            grad = penalty * w
+            hessian = np.diag(penalty)
+            for start, stop in bounds:
+                X, target_block = cached or design(start, stop)
+                p = _sigmoid(X @ w)
+                grad += X.T @ (p - target_block)
+                hessian += (X * (p * (1 - p))[:, None]).T @ X
+            step = np.linalg.solve(hessian, grad)
+            w -= step
+            if np.abs(step).max() < tol:
+                break
+
+        numeric = {col: (mean, std, w[1 + i]) for i, (col, mean, std) in enumerate(numeric_stats)}
+        categorical = {}
+        pos = 1 + len(numeric_stats)
+        for col in categoricals:
+            categorical[col] = dict(zip(levels[col], w[pos:pos + len(levels[col])]))
+            pos += len(levels[col])
+        return cls(w[0], numeric, categorical)
+
+    # ------------------------------
+    # 评分
+    # ------------------------------
+
+    def decision_function(self, df):
+        """批量计算对数几率：数值列一次矩阵乘法，分类列逐列按编码取系数。"""
+        X = np.column_stack([df[c].to_numpy() for c in self._num_cols]).astype(np.float64)
+        z = X @ self._scaled
+        z += self._offset
+        for col, table in self._tables.items():
+            z += table[_category_codes(df[col], self._levels[col])]
+        return z
+
+    def score_frame(self, df):
+        """批量接口：返回每行的流失概率。"""
+        return _sigmoid(self.decision_function(df))
+
+    def score_records(self, records):
+        """微批接口：对记录字典列表评分，不经过 pandas。
+
+        记录可以是原始CSV取值（'Yes'/'No'、TotalCharges 为空格），也可以是清洗后的取值。
+        """
+        n = len(records)
+        X = np.empty((n, len(self._num_cols)))
+        z = np.full(n, self._offset)
+        for i, record in enumerate(records):
+            for j, col in enumerate(self._num_cols):
+                X[i, j] = self._numeric_value(record, col)
+            for col, table in self.categorical.items():
+                z[i] += table.get(record.get(col), 0.0)
+        z += X @ self._scaled
+        return _sigmoid(z)
+
+    @staticmethod
+    def _numeric_value(record, col):
+        value = record[col]
+        if isinstance(value, str):
+            if value in BINARY_MAPPING:
+                return BINARY_MAPPING[value]
+            value = value.strip()
+            if not value and col == 'TotalCharges':
+                # 与预处理一致：空白总费用用 月费 × 在网月数 填充
+                return float(record['MonthlyCharges']) * float(record['tenure'])
+        return float(value)
+
+    def top_factors(self, n=10):
+        """按系数绝对值排序的主要风险因素（数值列为每个标准差的影响）。"""
+        rows = [(col, '', coef) for col, (_, _, coef) in self.numeric.items()]
+        rows += [(col, level, coef) for col, table in self.categorical.items()
+                 for level, coef in table.items()]
+        factors = pd.DataFrame(rows, columns=['feature', 'level', 'coef'])
+        return factors.reindex(factors['coef'].abs().sort_values(ascending=False).index).head(n)
+
+    # ------------------------------
+    # 持久化
+    # ------------------------------
+
+    def to_dict(self):
+        return {'version': MODEL_VERSION, 'intercept': self.intercept,
+                'numeric': self.numeric, 'categorical': self.categorical}
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != MODEL_VERSION:
+            raise ValueError(f"模型文件版本不兼容: {path}")
+        return cls(data['intercept'], data['numeric'], data['categorical'])
+
+
+def risk_band(probabilities):
+    """把概率映射为风险分层标签。"""
+    thresholds = np.array([t for t, _ in RISK_BANDS[:-1]])
+    labels = np.array([label for _, label in RISK_BANDS])
+    return labels[np.searchsorted(thresholds, probabilities, side='right')]
+
+
+def score_csv(path, model, output_path, chunksize=100_000):
+    """分块读取CSV并评分，结果（customerID, 概率, 风险分层）逐块追加写出。"""
+    from .schema import read_telco_csv
+
+    rows = 0
+    for i, chunk in enumerate(read_telco_csv(path, chunksize=chunksize)):
+        p = model.score_frame(chunk)
+        out = pd.DataFrame({'customerID': chunk['customerID'].to_numpy(),
+                            'churn_probability': p, 'risk_band': risk_band(p)})
+        out.to_csv(output_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        rows += len(out)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="电信客户流失分析 - 流失风险评分")
+    sub = parser.add_subparsers(dest='command', required=True)
+    train = sub.add_parser('train', help="在CSV上训练模型并保存")
+    train.add_argument('path')
+    train.add_argument('--model', default='churn_risk_model.json')
+    train.add_argument('--l2', type=float, default=1.0, help="L2 正则化强度")
+    score = sub.add_parser('score', help="用已保存的模型对CSV评分")
+    score.add_argument('path')
+    score.add_argument('--model', default='churn_risk_model.json')
+    score.add_argument('--output', default='churn_scores.csv')
+    score.add_argument('--chunksize', type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    if args.command == 'train':
+        from .schema import read_telco_csv
+
+        df = read_telco_csv(args.path)
+        model = ChurnRiskModel.fit(df, l2=args.l2)
+        model.save(args.model)
+        print(f"✅ 模型已保存为: {args.model}（训练集 AUC {roc_auc(df['Churn'], model.score_frame(df)):.3f}）")
+        print(model.top_factors().to_string(index=False))
+    else:
+        model = ChurnRiskModel.load(args.model)
+        rows = score_csv(args.path, model, args.output, args.chunksize)
+        print(f"✅ 已为 {rows:,} 名客户评分: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,363 @@
+# ==============================
+# 流失统计 HTTP 服务 - asyncio + TTL/LRU 缓存
+# ==============================
+#
+# BI 看板不再各自重跑脚本：服务启动时加载（或命中预处理缓存）一次数据，
+# 各维度流失率表、在网时长曲线、相关系数矩阵、细分查询的结果序列化为 JSON 后
+# 放入带过期时间的 LRU 缓存，缓存命中直接返回已编码的字节串。
+# 缓存未命中或过期时，重新计算在后台线程池中执行，不阻塞事件循环；
+# 同一个键的并发请求共享同一次计算，过期条目在后台刷新期间继续返回旧值。
+# 原始CSV发生变化（大小或修改时间）时自动重新加载数据并清空缓存。每次加载对应一个
+# 数据代数，缓存条目记录计算时使用的代数；重新加载前开始、之后才完成的计算结果
+# 与当前代数不符，不会写入缓存，读取时遇到旧代数的条目也视为未命中。
+#
+# 接口:
+#     GET  /health                       服务状态与缓存统计
+#     GET  /overview                     总体流失率（含 Wilson 区间）
+#     GET  /churn/<维度>                  单个维度的流失率表（含 Bootstrap 区间），如 /churn/Contract
+#     GET  /tenure                       在网时长与流失率曲线
+#     GET  /retention                    Kaplan-Meier 留存曲线与各分层的留存率表
+#     GET  /retention/<维度>              分层留存曲线，如 /retention/Contract
+#     GET  /correlation                  数值特征相关系数矩阵
+#     GET  /importance                   分类特征重要性排序（卡方 / Cramér's V / 互信息）
+#     GET  /segment?Contract=Month-to-month&tenure=0:6&by=InternetService   细分立方体查询
+#     POST /refresh                      强制重新加载数据并清空缓存
+#
+# 用法:
+#     python -m telecom_churn.service WA_Fn-UseC_-Telco-Customer-Churn.csv --port 8050 --ttl 300
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import ANALYSIS_DIMENSIONS, churn_table
+from .correlation import CorrelationAccumulator
+from .cube import parse_condition
+from .intervals import wilson_interval
+from .importance import feature_importance
+from .preprocess import NUMERIC_FEATURES
+from .survival import RETENTION_MONTHS
+from .report import DEFAULT_INPUT, ReportContext
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8050
+DEFAULT_TTL = 300.0
+DEFAULT_CACHE_SIZE = 256
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            500: 'Internal Server Error'}
+
+
+class TTLCache:
+    """带过期时间的 LRU 缓存；过期条目仍可取出（标记为不新鲜），由调用方决定是否刷新。"""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, ttl=DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """返回 (值, 是否未过期)；不存在时返回 (None, False)。"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, False
+        self._data.move_to_end(key)
+        self.hits += 1
+        expires, value = entry
+        return value, time.monotonic() < expires
+
+    def set(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Interval):
+        return str(value)
+    raise TypeError(f"无法序列化为 JSON: {type(value)!r}")
+
+
+def encode(payload):
+    return json.dumps(payload, ensure_ascii=False, default=_json_default).encode('utf-8')
+
+
+def check_segment_values(cube, where):
+    """细分查询中按取值筛选的条件必须是立方体中存在的取值，避免拼写错误返回空细分。"""
+    for dim, condition in where.items():
+        if isinstance(condition, slice) or dim not in cube.levels:
+            continue
+        values = condition if isinstance(condition, list) else [condition]
+        unknown = [str(v) for v in values if v not in cube.levels[dim]]
+        if unknown:
+            raise ValueError(f"{dim} 没有取值: {', '.join(unknown)}")
+
+
+def table_records(table):
+    """DataFrame → 记录列表（索引作为普通字段，NaN 转为 null）。"""
+    frame = table.reset_index()
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict('records')
+
+
+class ChurnService:
+    """持有数据上下文与结果缓存，负责把请求路径映射到计算函数。"""
+
+    def __init__(self, input_path=DEFAULT_INPUT, output_dir='.', ttl=DEFAULT_TTL,
+                 cache_size=DEFAULT_CACHE_SIZE, workers=1):
+        self.input_path = input_path
+        self.output_dir = output_dir
+        self.cache = TTLCache(cache_size, ttl)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self._inflight = {}
+        self._ctx = None
+        self._signature = None
+        # 数据代数：每次（重新）加载数据时递增；缓存中的条目为 (代数, 字节串)
+        self._generation = 0
+        self._cache_generation = 0
+        self._lock = threading.Lock()
+
+    # ------------------------------
+    # 数据上下文（在线程池中调用）
+    # ------------------------------
+
+    def _source_signature(self):
+        stat = os.stat(self.input_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def snapshot(self, force=False):
+        """返回 (数据上下文, 数据代数)；原始CSV变化或 force 时重新加载。"""
+        with self._lock:
+            signature = self._source_signature()
+            if force or self._ctx is None or signature != self._signature:
+                ctx = ReportContext(self.input_path, self.output_dir, numbers_only=True)
+                ctx.df  # 在后台线程中完成加载，之后的请求直接使用
+                self._ctx, self._signature = ctx, signature
+                self._generation += 1
+            return self._ctx, self._generation
+
+    def context(self, force=False):
+        """返回当前数据上下文；原始CSV变化或 force 时重新加载。"""
+        return self.snapshot(force)[0]
+
+    # ------------------------------
+    # 各接口的计算（在线程池中执行，返回可 JSON 序列化的对象）
+    # ------------------------------
+
+    def compute(self, path, query, ctx=None):
+        if ctx is None:
+            ctx = self.context()
+        if path == '/overview':
+            low, high = wilson_interval(ctx.churn_count, ctx.total_customers)
+            return {'total_customers': ctx.total_customers, 'churn_count': ctx.churn_count,
+                    'churn_rate': ctx.churn_rate / 100, 'ci_low': float(low),
+                    'ci_high': float(high)}
+        if path.startswith('/churn/'):
+            feature = path[len('/churn/'):]
+            if feature not in ctx.rate_tables:
+                raise KeyError(feature)
+            return {'dimension': feature, 'rows': table_records(ctx.rate_tables[feature])}
+        if path == '/tenure':
+            return {'rows': table_records(churn_table(ctx.churn_agg, 'tenure'))}
+        if path == '/retention':
+            return {'curve': table_records(ctx.retention.curve()),
+                    'retention': table_records(ctx.retention.retention(RETENTION_MONTHS))}
+        if path.startswith('/retention/'):
+            dimension = path[len('/retention/'):]
+            curves = ctx.retention.curves(dimension)
+            if not curves:
+                raise KeyError(dimension)
+            return {'dimension': dimension,
+                    'curves': {str(value): table_records(curve) for value, curve in curves.items()}}
+        if path == '/correlation':
+            matrix = CorrelationAccumulator(NUMERIC_FEATURES + ['Churn']).update(ctx.df).matrix()
+            return {'columns': list(matrix.columns), 'matrix': matrix.to_numpy().tolist()}
+        if path == '/importance':
+            return {'rows': table_records(feature_importance(ctx.churn_agg))}
+        if path == '/segment':
+            params = dict(query)
+            by = [d for d in params.pop('by', '').split(',') if d]
+            where = {dim: parse_condition(text) for dim, text in params.items()}
+            check_segment_values(ctx.segment_cube, where)
+            return {'by': by, 'where': params,
+                    'rows': table_records(ctx.segment_cube.query(by=by, **where))}
+        raise KeyError(path)
+
+    def _compute_tagged(self, path, query):
+        """在线程池中计算并编码，返回 (计算时的数据代数, 字节串)。"""
+        ctx, generation = self.snapshot()
+        return generation, encode(self.compute(path, query, ctx))
+
+    async def cached(self, path, query):
+        """缓存命中直接返回；未命中时在线程池中计算，同一个键只计算一次。"""
+        key = (path, tuple(sorted(query)))
+        entry, fresh = self.cache.get(key)
+        body = None
+        if entry is not None and entry[0] == self._generation:
+            body = entry[1]
+            if fresh:
+                return body
+        # 正在进行的计算按数据代数区分，重新加载后不会共享旧数据上的计算
+        flight = (self._generation, key)
+        task = self._inflight.get(flight)
+        if task is None:
+            task = asyncio.ensure_future(self._refresh(flight, key, path, query))
+            # 返回旧值时没有人等待该任务，取出异常避免 “never retrieved” 警告
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[flight] = task
+        if body is not None:
+            # 过期条目：先返回旧值，后台刷新完成后替换
+            return body
+        return await asyncio.shield(task)
+
+    async def _refresh(self, flight, key, path, query):
+        loop = asyncio.get_event_loop()
+        try:
+            generation, body = await loop.run_in_executor(self.executor, self._compute_tagged,
+                                                          path, query)
+            self._after_compute(generation)
+            # 计算期间数据已重新加载时，结果只返回给本次请求，不写入缓存
+            if generation == self._generation:
+                self.cache.set(key, (generation, body))
+            return body
+        finally:
+            self._inflight.pop(flight, None)
+
+    async def reload(self):
+        loop = asyncio.get_event_loop()
+        ctx, generation = await loop.run_in_executor(self.executor, self.snapshot, True)
+        self._after_compute(generation)
+        return encode({'status': 'reloaded', 'total_customers': ctx.total_customers})
+
+    def _after_compute(self, generation):
+        """数据重新加载后清空旧结果（在事件循环线程中调用）。"""
+        if generation != self._cache_generation:
+            self._cache_generation = generation
+            self.cache.clear()
+
+    def health(self):
+        return encode({'status': 'ok', 'cache_entries': len(self.cache),
+                       'cache_hits': self.cache.hits, 'cache_misses': self.cache.misses,
+                       'dimensions': [d for d in ANALYSIS_DIMENSIONS if d != 'tenure']})
+
+    # ------------------------------
+    # HTTP
+    # ------------------------------
+
+    async def dispatch(self, method, target):
+        parts = urlsplit(target)
+        path = parts.path.rstrip('/') or '/'
+        query = parse_qsl(parts.query)
+        if path == '/health':
+            return 200, self.health()
+        if path == '/refresh':
+            if method != 'POST':
+                return 405, encode({'error': '请使用 POST /refresh'})
+            return 200, await self.reload()
+        if method != 'GET':
+            return 405, encode({'error': f'不支持的方法: {method}'})
+        try:
+            return 200, await self.cached(path, query)
+        except KeyError as exc:
+            return 404, encode({'error': f'未知的资源: {exc.args[0]}'})
+        except (ValueError, TypeError) as exc:
+            return 400, encode({'error': str(exc)})
+
+    async def handle(self, reader, writer):
+        """处理一个连接上的请求（支持 HTTP/1.1 keep-alive）。"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, encode({'error': '无效的请求行'}), False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                if length:
+                    await reader.readexactly(length)
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version == 'HTTP/1.1')
+                try:
+                    status, body = await self.dispatch(method.upper(), target)
+                except Exception as exc:  # 计算失败时返回 500，连接继续可用
+                    status, body = 500, encode({'error': repr(exc)})
+                await self._respond(writer, status, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, body, keep_alive):
+        head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    # 启动时先在后台线程加载数据，第一个请求无需等待解析
+    await asyncio.get_event_loop().run_in_executor(service.executor, service.context)
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"🌐 流失统计服务已启动: http://{host}:{port}（缓存 TTL {service.cache.ttl:.0f} 秒）")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="电信客户流失分析 - 流失统计 HTTP 服务")
+    parser.add_argument('input', nargs='?', default=DEFAULT_INPUT, help="原始CSV路径")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL, help="缓存过期秒数")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE,
+                        help="缓存条目上限（LRU 淘汰）")
+    parser.add_argument('--output-dir', default='.', help="预处理缓存所在目录（<目录>/.cache）")
+    args = parser.parse_args(argv)
+
+    service = ChurnService(args.input, args.output_dir, args.ttl, args.cache_size)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.executor.shutdown(wait=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,357 @@
+# ==============================
+# 分块流式分析引擎
+# ==============================
+#
+# 按固定行数分块读取原始CSV，每个分块做与主脚本相同的数据质量校验与预处理
+# （validate.Validator，问题行写入隔离文件，重复编号跨分块检查），
+# 然后把流失计数、均值所需的求和以及分组统计累加到 ChurnAccumulator 中。
+# 内存占用只与分块大小和各维度的取值个数有关，与总行数无关。
+#
+# 用法:
+#     python -m telecom_churn.streaming WA_Fn-UseC_-Telco-Customer-Churn.csv --chunksize 500000 --quarantine quarantine.csv
+
+import argparse
+
+import numpy as np
+
+from .aggregate import aggregate_dimensions, churn_table, merge_aggregates
+from .correlation import CorrelationAccumulator
+from .importance import feature_importance
+from .preprocess import (CONTRACT_FEATURES, DEMOGRAPHIC_FEATURES, FINANCIAL_FEATURES,
+                         NUMERIC_FEATURES, SERVICE_FEATURES)
+from .quantiles import ChurnBinner
+from .survival import RetentionCurves
+from .validate import Validator, iter_validated, merge_reports, validation_lines
+
+DEFAULT_CHUNKSIZE = 100_000
+# 总费用直方图的细粒度分箱宽度（美元），最终30个区间由细分箱合并得到
+TOTAL_CHARGES_BIN_WIDTH = 1.0
+# 在网时长 × 总费用密度图的单元大小：每月一列，总费用每100美元一行
+TENURE_CHARGES_CELL = 100.0
+CORRELATION_FEATURES = NUMERIC_FEATURES + ['Churn']
+
+
+def iter_chunks(path, chunksize=DEFAULT_CHUNKSIZE, validator=None, **read_kwargs):
+    """逐块读取原始CSV，校验后产出已预处理的分块（结构与 read_telco_csv 相同）。
+
+    validator 为 None 时新建一个（只剔除问题行，不写隔离文件）；多次调用共用同一个
+    validator 时重复编号跨调用检查，违规数累计在其中。
+    """
+    return iter_validated(path, chunksize, validator or Validator(), **read_kwargs)
+
+
+def _add_frames(left, right):
+    """按索引对齐相加两张计数表（缺失的分组视为0）。"""
+    if left is None:
+        return right
+    return left.add(right, fill_value=0)
+
+
+def _add_grids(left, right):
+    """相加两个形状可能不同的 (2, 在网时长, 总费用分箱) 计数网格。"""
+    shape = tuple(max(a, b) for a, b in zip(left.shape, right.shape))
+    out = np.zeros(shape, dtype=np.int64)
+    out[:, :left.shape[1], :left.shape[2]] += left
+    out[:, :right.shape[1], :right.shape[2]] += right
+    return out
+
+
+def _merge_retention(left, right):
+    """合并两份留存曲线计数（left 为空时直接取 right）。"""
+    if left is None:
+        return right
+    return left.merge(right)
+
+
+def _add_arrays(left, right):
+    """相加两个长度可能不同的计数数组。"""
+    if len(left) < len(right):
+        left, right = right, left
+    out = left.copy()
+    out[:len(right)] += right
+    return out
+
+
+class ChurnAccumulator:
+    """可增量更新、可合并的流失分析累加器。
+
+    所有状态都是可加的充分统计量（计数与求和），因此分块顺序无关，
+    两个累加器可以直接 merge。
+    """
+
+    def __init__(self):
+        self.n_rows = 0
+        self.n_columns = 0
+        self.churn_sum = 0
+        # (维度, 取值) -> [count, churn]，包含 tenure，见 aggregate.aggregate_dimensions
+        self.groups = None
+        # MonthlyCharges 精确取值 -> [count, churn]，取值个数受价格粒度限制
+        self.monthly_values = None
+        # Churn -> [count, MonthlyCharges, TotalCharges, tenure 的求和]
+        self.financial = None
+        # 总费用细分箱计数，按 [留存, 流失] 分开
+        self.total_charges_hist = [np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)]
+        self.total_charges_min = np.inf
+        self.total_charges_max = -np.inf
+        # 在网时长 × 总费用分箱计数，形状 (2, 在网时长, 总费用分箱)，第一维为 [留存, 流失]
+        self.tenure_charges = np.zeros((2, 0, 0), dtype=np.int64)
+        # 相关系数所需的 n、均值与离差叉积矩阵
+        self.correlation = CorrelationAccumulator(CORRELATION_FEATURES)
+        # 整体与各分层在每个在网月数上的 [删失数, 流失数]，用于 Kaplan-Meier 留存曲线
+        self.retention = None
+        # 月费 / 总费用 / 在网时长的分位数草图（全部客户与流失客户），用于等频分箱
+        self.binner = ChurnBinner()
+        # 数据质量校验结果（Validator.report() 的字典），合并时逐项相加
+        self.validation = None
+
+    # ---------- 更新 ----------
+
+    def update(self, df):
+        """把一个已预处理的分块累加进来。"""
+        if len(df) == 0:
+            return self
+        self.n_rows += len(df)
+        self.n_columns = df.shape[1]
+        self.churn_sum += int(df['Churn'].sum())
+
+        self.groups = merge_aggregates(self.groups, aggregate_dimensions(df))
+
+        monthly = df['MonthlyCharges'].astype(np.float64).round(2)
+        monthly_stats = df['Churn'].groupby(monthly).agg(['count', 'sum'])
+        monthly_stats.columns = ['count', 'churn']
+        self.monthly_values = _add_frames(self.monthly_values, monthly_stats)
+
+        # float32 列转为 float64 再求和，避免大数据量下的累加误差
+        financial = df[FINANCIAL_FEATURES].astype(np.float64).groupby(df['Churn']).sum()
+        financial.insert(0, 'count', df.groupby('Churn').size())
+        self.financial = _add_frames(self.financial, financial)
+
+        total = df['TotalCharges'].to_numpy(dtype=np.float64)
+        churn = df['Churn'].to_numpy()
+        self.total_charges_min = min(self.total_charges_min, total.min())
+        self.total_charges_max = max(self.total_charges_max, total.max())
+        # 类型模式允许负的总费用（如退款冲销），与密度网格一样并入第一个细分箱
+        fine = np.clip(np.floor(total / TOTAL_CHARGES_BIN_WIDTH).astype(np.int64), 0, None)
+        for cls in (0, 1):
+            counts = np.bincount(fine[churn == cls])
+            self.total_charges_hist[cls] = _add_arrays(self.total_charges_hist[cls], counts)
+
+        tenure = np.clip(df['tenure'].to_numpy(dtype=np.int64), 0, None)
+        cell = np.clip(np.floor(total / TENURE_CHARGES_CELL).astype(np.int64), 0, None)
+        n_tenure, n_cell = tenure.max() + 1, cell.max() + 1
+        key = (churn.astype(np.int64) * n_tenure + tenure) * n_cell + cell
+        grid = np.bincount(key, minlength=2 * n_tenure * n_cell).reshape(2, n_tenure, n_cell)
+        self.tenure_charges = _add_grids(self.tenure_charges, grid)
+
+        self.correlation.update(df)
+        self.retention = _merge_retention(self.retention, RetentionCurves.from_frame(df))
+        self.binner.update(df)
+        return self
+
+    def merge(self, other):
+        """合并另一个累加器的状态（例如来自其他分区或进程）。"""
+        self.n_rows += other.n_rows
+        self.n_columns = self.n_columns or other.n_columns
+        self.churn_sum += other.churn_sum
+        if other.groups is not None:
+            self.groups = merge_aggregates(self.groups, other.groups)
+        for attr in ('monthly_values', 'financial'):
+            theirs = getattr(other, attr)
+            if theirs is not None:
+                setattr(self, attr, _add_frames(getattr(self, attr), theirs))
+        for cls in (0, 1):
+            self.total_charges_hist[cls] = _add_arrays(self.total_charges_hist[cls],
+                                                       other.total_charges_hist[cls])
+        self.total_charges_min = min(self.total_charges_min, other.total_charges_min)
+        self.total_charges_max = max(self.total_charges_max, other.total_charges_max)
+        self.tenure_charges = _add_grids(self.tenure_charges, other.tenure_charges)
+        self.correlation.merge(other.correlation)
+        if other.retention is not None:
+            self.retention = _merge_retention(self.retention, other.retention)
+        self.binner.merge(other.binner)
+        self.validation = merge_reports(self.validation, other.validation)
+        return self
+
+    # ---------- 结果 ----------
+
+    def group_table(self, feature):
+        """返回与 df.groupby(feature)['Churn'].agg(['mean', 'count']) 同结构的表。"""
+        return churn_table(self.groups, feature)
+
+    def tenure_churn(self):
+        return churn_table(self.groups, 'tenure')['mean'].rename('Churn')
+
+    def financial_means(self):
+        """留存/流失两类客户的财务指标均值。"""
+        return self.financial[FINANCIAL_FEATURES].div(self.financial['count'], axis=0)
+
+    def overall_means(self):
+        return self.financial[FINANCIAL_FEATURES].sum() / self.n_rows
+
+    def monthly_churn(self, bins=10):
+        """月费等频分箱的流失率曲线（由分位数草图得到，与主脚本一致）。"""
+        return self.binner.churn_curve('MonthlyCharges', bins)
+
+    def monthly_histogram(self, bins=30):
+        """月费直方图（按留存/流失），返回 (边界, [留存计数, 流失计数])。"""
+        values = self.monthly_values.index.to_numpy(dtype=np.float64)
+        count = self.monthly_values['count'].to_numpy()
+        churned = self.monthly_values['churn'].to_numpy()
+        edges = np.histogram_bin_edges(values, bins=bins)
+        stayed_hist, _ = np.histogram(values, bins=edges, weights=count - churned)
+        churned_hist, _ = np.histogram(values, bins=edges, weights=churned)
+        return edges, [stayed_hist, churned_hist]
+
+    def total_charges_histogram(self, bins=30):
+        """总费用直方图（按留存/流失），由细分箱合并，误差不超过一个细分箱宽度。"""
+        edges = np.linspace(self.total_charges_min, self.total_charges_max, bins + 1)
+        counts = []
+        for cls in (0, 1):
+            fine = self.total_charges_hist[cls]
+            centers = (np.arange(len(fine)) + 0.5) * TOTAL_CHARGES_BIN_WIDTH
+            centers = np.clip(centers, self.total_charges_min, self.total_charges_max)
+            hist, _ = np.histogram(centers, bins=edges, weights=fine)
+            counts.append(hist)
+        return edges, counts
+
+    def tenure_charges_density(self):
+        """在网时长 × 总费用密度 (x边界, y边界, counts)，格式同 density.class_histogram2d。"""
+        _, n_tenure, n_cell = self.tenure_charges.shape
+        return (np.arange(n_tenure + 1, dtype=np.float64),
+                np.arange(n_cell + 1) * TENURE_CHARGES_CELL,
+                self.tenure_charges)
+
+    def correlation_matrix(self):
+        return self.correlation.matrix()
+
+    def chart_data(self):
+        """生成与主脚本相同结构的图表输入，供 charts.render_all 使用。"""
+        return {
+            'churn_overview': {
+                'churn_counts': [self.n_rows - self.churn_sum, self.churn_sum],
+                'retention': self.retention.curve(),
+            },
+            'demographic_analysis': {
+                'tables': {f: self.group_table(f) for f in DEMOGRAPHIC_FEATURES},
+            },
+            'service_analysis': {
+                'tables': {f: self.group_table(f) for f in SERVICE_FEATURES},
+            },
+            'contract_payment_analysis': {
+                'contract': self.group_table('Contract').sort_values('mean'),
+                'payment': self.group_table('PaymentMethod').sort_values('mean'),
+            },
+            'financial_analysis': {
+                'monthly_hist': self.monthly_histogram(),
+                'total_hist': self.total_charges_histogram(),
+                'monthly_churn': self.monthly_churn(),
+                'density': self.tenure_charges_density(),
+            },
+            'correlation_analysis': {'correlation_matrix': self.correlation_matrix()},
+            'retention_curves': self.retention.chart_data(),
+            'feature_importance': {'ranking': feature_importance(self.groups)},
+        }
+
+
+def accumulate_csv(path, chunksize=DEFAULT_CHUNKSIZE, quarantine_path=None):
+    """流式读取并校验整个CSV，返回累加完成的 ChurnAccumulator（校验结果在 acc.validation）。"""
+    acc = ChurnAccumulator()
+    validator = Validator(quarantine_path=quarantine_path)
+    try:
+        for chunk in iter_chunks(path, chunksize, validator):
+            acc.update(chunk)
+    finally:
+        validator.close()
+    acc.validation = validator.report()
+    return acc
+
+
+def _level_label(feature, val):
+    """将0/1编码还原为可读标签。"""
+    if feature == 'gender':
+        return '男' if val == 1 else '女'
+    if feature in ('SeniorCitizen', 'Partner', 'Dependents', 'PhoneService'):
+        return '是' if val == 1 else '否'
+    return val
+
+
+def print_validation(validation, quarantine_path=None):
+    """输出数据质量校验结果（格式与主脚本第2章相同）。"""
+    if validation is None:
+        return
+    target = f" → {quarantine_path}" if quarantine_path else ''
+    print(f"\n🔎 数据质量校验: {validation['rows']:,} 行，"
+          f"隔离 {validation['quarantined']:,} 行{target}")
+    for line in validation_lines(validation):
+        print(line)
+
+
+def print_report(acc, quarantine_path=None):
+    """按主脚本各章节的格式输出流式统计结果。"""
+    total_customers = acc.n_rows
+    churn_count = acc.churn_sum
+    churn_rate = churn_count / total_customers * 100
+
+    print("=" * 50)
+    print("电信客户流失分析 - 分块流式模式")
+    print("=" * 50)
+    print(f"数据形状: ({total_customers}, {acc.n_columns})")
+    print_validation(acc.validation, quarantine_path)
+
+    print("\n📈 总体流失分析:")
+    print(f"总客户数: {total_customers:,}")
+    print(f"流失客户数: {churn_count:,}")
+    print(f"流失率: {churn_rate:.2f}%")
+    print(f"留存客户数: {total_customers - churn_count:,}")
+    print(f"留存率: {100 - churn_rate:.2f}%")
+
+    print("\n📊 人口特征流失率统计:")
+    for feature in DEMOGRAPHIC_FEATURES:
+        print(f"\n{feature}:")
+        for val, row in acc.group_table(feature).iterrows():
+            print(f"  {_level_label(feature, val)}: {int(row['count']):,} 客户, "
+                  f"流失率: {row['mean']*100:.1f}%")
+
+    print("\n🔍 服务使用特征流失率:")
+    for feature in SERVICE_FEATURES:
+        print(f"\n{feature}:")
+        for val, row in acc.group_table(feature).iterrows():
+            print(f"  {_level_label(feature, val)}: {int(row['count']):,} 客户, "
+                  f"流失率: {row['mean']*100:.1f}%")
+
+    for feature, banner in zip(CONTRACT_FEATURES, ["📊 合同类型详细分析:", "💳 支付方式详细分析:"]):
+        print(f"\n{banner}")
+        for val, row in acc.group_table(feature).sort_values('mean').iterrows():
+            print(f"  {val}: {int(row['count']):,} 客户, 流失率: {row['mean']*100:.1f}%")
+
+    overall = acc.overall_means()
+    means = acc.financial_means()
+    print("\n💰 财务指标统计:")
+    print(f"平均月费: ${overall['MonthlyCharges']:.2f}")
+    print(f"平均总费用: ${overall['TotalCharges']:.2f}")
+    print(f"平均在网时长: {overall['tenure']:.1f} 月")
+    for cls, name in ((0, "留存客户"), (1, "流失客户")):
+        print(f"\n{name}:")
+        print(f"  平均月费: ${means.loc[cls, 'MonthlyCharges']:.2f}")
+        print(f"  平均总费用: ${means.loc[cls, 'TotalCharges']:.2f}")
+        print(f"  平均在网时长: {means.loc[cls, 'tenure']:.1f} 月")
+
+    print("\n📊 与流失最相关的特征:")
+    churn_corr = acc.correlation.ranking('Churn')
+    for feature, val in churn_corr.items():
+        print(f"  {feature}: {val:.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="电信客户流失分析 - 分块流式模式")
+    parser.add_argument('csv_path', help="原始 Telco CSV 路径")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help="每个分块的行数")
+    parser.add_argument('--quarantine', default='quarantine.csv', help="隔离文件路径")
+    args = parser.parse_args(argv)
+    acc = accumulate_csv(args.csv_path, args.chunksize, args.quarantine)
+    print_report(acc, args.quarantine)
+
+
+if __name__ == '__main__':
+    main()
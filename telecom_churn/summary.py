@@ -0,0 +1,588 @@
+# ==============================
+# 分析摘要 - 由聚合结果生成的模板化报告
+# ==============================
+#
+# 第9章的关键发现与 analysis_summary.txt 原先是写死的文字，与实际计算结果脱节。
+# 这里只用运行中已经得到的聚合结果生成摘要，不再读取行数据：
+#   - 多维度聚合表（aggregate_dimensions）：总体指标、各细分流失率排名、特征重要性；
+#   - 细分立方体（可选）：由最重要的几个维度组合出的重点细分及其新客户子集；
+#   - 留存曲线（可选）：新客户第1-3个月留存率与留存最差的分层。
+# build_summary 返回可序列化的字典，文本 / JSON / HTML 由 string.Template 模板渲染。
+# 已保存的 segment_cube.npz 本身就包含所需的聚合计数，各区域分区的报告可以
+# 直接由立方体文件重新生成，只是一次模板渲染。
+#
+# 用法:
+#     python -m telecom_churn.summary WA_Fn-UseC_-Telco-Customer-Churn.csv --formats text json html
+#     python -m telecom_churn.summary region_*/segment_cube.npz --output-dir reports
+
+import argparse
+import html
+import json
+import os
+from string import Template
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import ANALYSIS_DIMENSIONS, aggregate_dimensions, churn_table, merge_aggregates
+from .cube import BANDED_DIMENSIONS, CUBE_FILENAME, TENURE_BAND, SegmentCube
+from .importance import IMPORTANCE_FEATURES, feature_importance
+from .survival import KPI_MONTHS, OVERALL, RetentionCurves
+
+SUMMARY_FORMATS = ('text', 'json', 'html')
+SUMMARY_EXTENSIONS = {'text': '.txt', 'json': '.json', 'html': '.html'}
+# 参与排名的细分至少占全部客户的比例，避免小样本细分排在前面
+MIN_SEGMENT_SHARE = 0.05
+TOP_SEGMENTS = 5
+TOP_DRIVERS = 5
+# 重点细分由 Cramér's V 最高的几个维度组合而成
+TARGET_DIMENSIONS = 3
+
+FEATURE_NAMES = {
+    'gender': '性别', 'SeniorCitizen': '老年人', 'Partner': '伴侣', 'Dependents': '家属',
+    'PhoneService': '电话服务', 'MultipleLines': '多线路', 'InternetService': '互联网服务',
+    'OnlineSecurity': '在线安全', 'OnlineBackup': '在线备份', 'DeviceProtection': '设备保护',
+    'TechSupport': '技术支持', 'StreamingTV': '流媒体电视', 'StreamingMovies': '流媒体电影',
+    'Contract': '合同类型', 'PaymentMethod': '支付方式', 'PaperlessBilling': '无纸化账单',
+    'tenure': '在网时长', 'MonthlyCharges': '月费',
+}
+
+# 高流失细分对应的建议模板，按维度选取；同一维度只给出一条
+RECOMMENDATION_TEMPLATES = {
+    'Contract': Template("推广长期合同优惠（年付/两年付折扣），优先转化 $value 客户（流失率 $rate）"),
+    'PaymentMethod': Template("推广自动支付方式的奖励计划，引导 $value 用户切换（流失率 $rate）"),
+    'InternetService': Template("改善 $value 用户的服务体验与技术支持（流失率 $rate）"),
+    'tenure': Template("加强新客户的留存管理：$label 的客户流失率 $rate"),
+    'MonthlyCharges': Template("针对 $label 的客户提供个性化套餐（流失率 $rate）"),
+}
+ADDON_TEMPLATE = Template("为未开通$name的客户提供增值服务捆绑（流失率 $rate）")
+DEFAULT_TEMPLATE = Template("对 $label 的客户进行主动关怀（流失率 $rate）")
+ADDON_FEATURES = ('OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 'TechSupport',
+                  'StreamingTV', 'StreamingMovies')
+
+
+def _percent(rate):
+    return '-' if rate is None else f'{rate:.1%}'
+
+
+def _band_text(feature, lower, upper=None):
+    """分箱区间的文字；upper 为 None 表示没有上界（… 及以上）。"""
+    if feature == 'tenure':
+        if upper is None:
+            return f'{lower} 个月及以上'
+        return f'{lower} 个月' if upper == lower else f'{lower}-{upper} 个月'
+    if upper is None:
+        return f'${lower:g} 及以上'
+    return f'${lower:g}-{upper:g}'
+
+
+def value_label(feature, value, limits=None):
+    """细分取值的可读标签（0/1 编码还原为 男/女、是/否，分箱维度显示为区间）。
+
+    limits 为 _band_limits 的结果：最高一档的上界截断到观察到的最大值，
+    最大值未知（由立方体生成）时写作 “… 及以上”。
+    """
+    if feature == 'gender':
+        return '男' if value == 1 else '女'
+    if feature in ('SeniorCitizen', 'Partner', 'Dependents', 'PhoneService', 'PaperlessBilling'):
+        return '是' if value == 1 else '否'
+    if feature in BANDED_DIMENSIONS and value is not None:
+        width = BANDED_DIMENSIONS[feature]
+        # 在网时长为整月，区间写作闭区间 0-5；月费为连续值，区间写作 [70, 80)
+        upper = value + width - 1 if feature == 'tenure' else value + width
+        top, observed = (limits or {}).get(feature, (None, None))
+        if top is not None and value >= top:
+            upper = observed
+        return _band_text(feature, value, upper)
+    return str(value)
+
+
+def segment_label(feature, value, limits=None):
+    return f"{FEATURE_NAMES.get(feature, feature)}={value_label(feature, value, limits)}"
+
+
+def _python(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _band_limits(table):
+    """各分箱维度的 (最高一档的下边界, 观察到的最大值)。
+
+    由立方体上卷的聚合表（attrs['banded']）只有分箱下边界，最大值未知记为 None。
+    """
+    dims = set(table.index.get_level_values('dimension'))
+    limits = {}
+    for feature, width in BANDED_DIMENSIONS.items():
+        if feature not in dims:
+            continue
+        values = [v for v in table.xs(feature, level='dimension').index if pd.notna(v)]
+        if not values:
+            continue
+        observed = _python(max(values))
+        top = observed // width * width
+        if float(width).is_integer():
+            top = int(top)
+        limits[feature] = (top, None if table.attrs.get('banded') else observed)
+    return limits
+
+
+def _feature_tables(table):
+    """各维度的 [count, churn]；在网时长按 TENURE_BAND 个月分箱。"""
+    dims = set(table.index.get_level_values('dimension'))
+    tables = {}
+    for feature in IMPORTANCE_FEATURES:
+        if feature in dims:
+            stats = churn_table(table, feature)
+            tables[feature] = pd.DataFrame({'count': stats['count'],
+                                            'churn': stats['mean'] * stats['count']})
+    if 'tenure' in dims:
+        tenure = table.xs('tenure', level='dimension')[['count', 'churn']]
+        band = np.asarray(tenure.index.tolist(), dtype=np.int64) // TENURE_BAND * TENURE_BAND
+        tables['tenure'] = tenure.groupby(band).sum()
+    return tables
+
+
+def rank_segments(table, min_share=MIN_SEGMENT_SHARE):
+    """所有单维度细分按流失率排序（降序），只保留客户占比不低于 min_share 的细分。"""
+    rows = []
+    for feature, stats in _feature_tables(table).items():
+        for value, row in stats.iterrows():
+            rows.append((feature, _python(value), int(row['count']), int(round(row['churn']))))
+    ranked = pd.DataFrame(rows, columns=['feature', 'value', 'count', 'churn'])
+    total = ranked.groupby('feature')['count'].sum().max()
+    ranked = ranked[ranked['count'] >= min_share * total].copy()
+    ranked['rate'] = ranked['churn'] / ranked['count']
+    return ranked.sort_values(['rate', 'count'], ascending=[False, False], ignore_index=True)
+
+
+def _segment_entry(row, overall_rate, limits=None):
+    return {'feature': row['feature'], 'value': row['value'],
+            'label': segment_label(row['feature'], row['value'], limits),
+            'count': int(row['count']), 'churn_rate': float(row['rate']),
+            'lift': float(row['rate'] / overall_rate) if overall_rate else None}
+
+
+def _target_segment(cube, drivers, min_share, limits=None):
+    """Cramér's V 最高的几个维度组合中流失率最高的细分，以及其中的新客户子集。"""
+    dims = [d['feature'] for d in drivers if d['feature'] in cube.dimensions][:TARGET_DIMENSIONS]
+    if not dims:
+        return None
+    cells = cube.query(by=dims)
+    cells = cells[cells['count'] >= min_share * cube.n_rows]
+    if cells.empty:
+        return None
+    best = cells['rate'].idxmax()
+    values = best if isinstance(best, tuple) else (best,)
+    conditions = {d: _python(v) for d, v in zip(dims, values)}
+    count, _, rate = cube.segment(**conditions)
+    target = {'conditions': conditions,
+              'label': ' + '.join(segment_label(d, v, limits) for d, v in conditions.items()),
+              'count': count, 'churn_rate': float(rate), 'new_customers': None}
+    if 'tenure' in cube.dimensions:
+        new_count, _, new_rate = cube.segment(tenure=slice(0, TENURE_BAND), **conditions)
+        target['new_customers'] = {'months': TENURE_BAND, 'count': new_count,
+                                   'churn_rate': None if new_count == 0 else float(new_rate)}
+    return target
+
+
+def _retention_summary(retention):
+    kpi = retention.new_customer_retention()
+    table = retention.retention(KPI_MONTHS).drop(index=[OVERALL], errors='ignore')
+    worst = None
+    month = KPI_MONTHS[-1]
+    if not table.empty and table[month].notna().any():
+        dimension, value = table[month].idxmin()
+        worst = {'feature': dimension, 'value': _python(value),
+                 'label': segment_label(dimension, value), 'month': month,
+                 'retention': float(table[month].min())}
+    return {'months': {str(m): r for m, r in kpi.items()}, 'worst': worst}
+
+
+def _recommendations(high, limits=None):
+    out = []
+    seen = set()
+    for seg in high:
+        feature = seg['feature']
+        group = 'addon' if feature in ADDON_FEATURES else feature
+        if group in seen:
+            continue
+        seen.add(group)
+        fields = dict(value=value_label(feature, seg['value'], limits), label=seg['label'],
+                      name=FEATURE_NAMES.get(feature, feature), rate=_percent(seg['churn_rate']))
+        if feature in ADDON_FEATURES:
+            template = ADDON_TEMPLATE if seg['value'] == 'No' else DEFAULT_TEMPLATE
+        else:
+            template = RECOMMENDATION_TEMPLATES.get(feature, DEFAULT_TEMPLATE)
+        out.append(template.substitute(fields))
+    return out
+
+
+def build_summary(table, cube=None, retention=None, risk=None, generated_at=None,
+                  min_share=MIN_SEGMENT_SHARE, top=TOP_SEGMENTS):
+    """由聚合表（及可选的立方体、留存曲线、风险评分结果）生成可序列化的摘要字典。"""
+    first = table.index.get_level_values('dimension')[0]
+    totals = table.xs(first, level='dimension')[['count', 'churn']].sum()
+    total, churned = int(totals['count']), int(totals['churn'])
+    overall_rate = churned / total if total else 0.0
+
+    limits = _band_limits(table)
+    ranked = rank_segments(table, min_share)
+    high = [_segment_entry(row, overall_rate, limits) for _, row in ranked.head(top).iterrows()
+            if row['rate'] > overall_rate]
+    low = [_segment_entry(row, overall_rate, limits)
+           for _, row in ranked.iloc[::-1].head(top).iterrows() if row['rate'] < overall_rate]
+
+    ranking = feature_importance(table)
+    drivers = [{'feature': feature, 'name': FEATURE_NAMES.get(feature, feature),
+                'cramers_v': float(row['cramers_v']), 'mutual_info': float(row['mutual_info']),
+                'p_value': float(row['p_value'])}
+               for feature, row in ranking.head(TOP_DRIVERS).iterrows()]
+
+    if generated_at is None:
+        generated_at = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+    return {
+        'generated_at': generated_at,
+        'metrics': {'total_customers': total, 'churn_count': churned,
+                    'churn_rate': overall_rate},
+        'high_churn_segments': high,
+        'low_churn_segments': low,
+        'drivers': drivers,
+        'target_segment': (None if cube is None
+                           else _target_segment(cube, drivers, min_share, limits)),
+        'retention': None if retention is None else _retention_summary(retention),
+        'risk': risk,
+        'recommendations': _recommendations(high, limits),
+    }
+
+
+# ------------------------------
+# 渲染
+# ------------------------------
+
+# 文本摘要随仓库提交，不含运行时间，内容只随数据与分析结果变化；生成时间见 JSON/HTML
+TEXT_TEMPLATE = Template("""
+电信客户流失分析报告
+
+关键指标:
+- 总客户数: $total_customers
+- 流失客户数: $churn_count
+- 总体流失率: $churn_rate
+
+高流失特征（客户占比 ≥ $min_share 的细分中流失率最高）:
+$high
+
+低流失特征:
+$low
+
+主要流失驱动因素（Cramér's V）:
+$drivers
+$target$retention$risk
+业务建议:
+$recommendations
+""")
+
+CONSOLE_TEMPLATE = Template("""
+🎯 关键发现:
+1. 📉 总体流失率: $churn_rate（$churn_count / $total_customers）
+2. 🔍 高流失群体:
+$high
+
+3. 📊 低流失群体:
+$low
+
+4. 🧭 主要流失驱动因素（Cramér's V）:
+$drivers
+$target$retention$risk
+💡 战略建议:
+$recommendations""")
+
+HTML_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>电信客户流失分析报告</title>
+<style>
+body { font-family: sans-serif; margin: 2em; }
+table { border-collapse: collapse; margin-bottom: 1.5em; }
+th, td { border: 1px solid #ccc; padding: 4px 10px; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+</style>
+</head>
+<body>
+<h1>电信客户流失分析报告</h1>
+<p>生成时间: $generated_at</p>
+<h2>关键指标</h2>
+<ul>
+<li>总客户数: $total_customers</li>
+<li>流失客户数: $churn_count</li>
+<li>总体流失率: $churn_rate</li>
+</ul>
+<h2>高流失特征</h2>
+$high
+<h2>低流失特征</h2>
+$low
+<h2>主要流失驱动因素</h2>
+$drivers
+$target$retention$risk
+<h2>业务建议</h2>
+$recommendations
+</body>
+</html>
+""")
+
+
+def _segment_line(seg):
+    return (f"{seg['label']}: {seg['count']:,} 客户, 流失率 {_percent(seg['churn_rate'])}"
+            f"（整体的 {seg['lift']:.2f} 倍）")
+
+
+def _driver_line(driver):
+    return (f"{driver['name']} ({driver['feature']}): Cramér's V {driver['cramers_v']:.3f}, "
+            f"互信息 {driver['mutual_info']:.4f} 比特")
+
+
+def _target_lines(target):
+    lines = [f"{target['label']}: {target['count']:,} 客户, 流失率 {_percent(target['churn_rate'])}"]
+    new = target['new_customers']
+    if new is not None:
+        lines.append(f"其中在网<{new['months']}个月: {new['count']:,} 客户, "
+                     f"流失率 {_percent(new['churn_rate'])}")
+    return lines
+
+
+def _retention_lines(retention):
+    lines = ["新客户留存率: " + ", ".join(f"第{m}个月 {_percent(r)}"
+                                    for m, r in retention['months'].items())]
+    worst = retention['worst']
+    if worst is not None:
+        lines.append(f"第{worst['month']}个月留存率最低的分层: {worst['label']} "
+                     f"{_percent(worst['retention'])}")
+    return lines
+
+
+def _risk_lines(risk):
+    return [f"模型训练集 AUC: {risk['auc']:.3f}",
+            f"当前在网的高风险客户（流失概率 ≥ {risk['threshold']:.0%}）: "
+            f"{risk['active_high_risk']:,}"]
+
+
+def _bullets(lines, prefix):
+    return '\n'.join(prefix + line for line in lines) or prefix + '无'
+
+
+def _numbered(lines, indent=''):
+    return '\n'.join(f"{indent}{i}. {line}" for i, line in enumerate(lines, 1)) or indent + '无'
+
+
+def _metric_fields(summary):
+    metrics = summary['metrics']
+    return dict(generated_at=summary['generated_at'],
+                total_customers=f"{metrics['total_customers']:,}",
+                churn_count=f"{metrics['churn_count']:,}",
+                churn_rate=f"{metrics['churn_rate']:.2%}",
+                min_share=f"{MIN_SEGMENT_SHARE:.0%}")
+
+
+def render_text(summary):
+    """analysis_summary.txt 的文本。"""
+    blocks = {'target': '', 'retention': '', 'risk': ''}
+    if summary['target_segment'] is not None:
+        blocks['target'] = "\n重点细分（主要驱动因素组合中流失率最高）:\n" + _bullets(
+            _target_lines(summary['target_segment']), '- ') + '\n'
+    if summary['retention'] is not None:
+        blocks['retention'] = "\n新客户留存:\n" + _bullets(
+            _retention_lines(summary['retention']), '- ') + '\n'
+    if summary['risk'] is not None:
+        blocks['risk'] = "\n流失风险评分:\n" + _bullets(_risk_lines(summary['risk']), '- ') + '\n'
+    return TEXT_TEMPLATE.substitute(
+        _metric_fields(summary),
+        high=_numbered([_segment_line(s) for s in summary['high_churn_segments']]),
+        low=_numbered([_segment_line(s) for s in summary['low_churn_segments']]),
+        drivers=_numbered([_driver_line(d) for d in summary['drivers']]),
+        recommendations=_numbered(summary['recommendations']),
+        **blocks)
+
+
+def render_console(summary):
+    """第9章控制台输出。"""
+    blocks = {'target': '', 'retention': '', 'risk': ''}
+    if summary['target_segment'] is not None:
+        blocks['target'] = "\n🎯 重点细分（主要驱动因素组合中流失率最高）:\n" + _bullets(
+            _target_lines(summary['target_segment']), '   - ') + '\n'
+    if summary['retention'] is not None:
+        blocks['retention'] = "\n📈 监控指标:\n" + _bullets(
+            _retention_lines(summary['retention']), '   - ') + '\n'
+    if summary['risk'] is not None:
+        blocks['risk'] = "\n🤖 流失风险评分:\n" + _bullets(
+            _risk_lines(summary['risk']), '   - ') + '\n'
+    return CONSOLE_TEMPLATE.substitute(
+        _metric_fields(summary),
+        high=_bullets([_segment_line(s) for s in summary['high_churn_segments']], '   - '),
+        low=_bullets([_segment_line(s) for s in summary['low_churn_segments']], '   - '),
+        drivers=_bullets([_driver_line(d) for d in summary['drivers']], '   - '),
+        recommendations=_numbered(summary['recommendations']),
+        **blocks)
+
+
+def render_json(summary):
+    return json.dumps(summary, ensure_ascii=False, indent=2)
+
+
+def _html_table(segments):
+    if not segments:
+        return '<p>无</p>'
+    rows = ''.join(f"<tr><td>{html.escape(s['label'])}</td><td>{s['count']:,}</td>"
+                   f"<td>{_percent(s['churn_rate'])}</td><td>{s['lift']:.2f}</td></tr>\n"
+                   for s in segments)
+    return ("<table>\n<tr><th>细分</th><th>客户数</th><th>流失率</th><th>相对整体</th></tr>\n"
+            + rows + "</table>")
+
+
+def _html_list(lines, tag='ul'):
+    items = ''.join(f"<li>{html.escape(line)}</li>\n" for line in lines)
+    return f"<{tag}>\n{items}</{tag}>"
+
+
+def render_html(summary):
+    blocks = {'target': '', 'retention': '', 'risk': ''}
+    if summary['target_segment'] is not None:
+        blocks['target'] = "<h2>重点细分</h2>\n" + _html_list(
+            _target_lines(summary['target_segment'])) + '\n'
+    if summary['retention'] is not None:
+        blocks['retention'] = "<h2>新客户留存</h2>\n" + _html_list(
+            _retention_lines(summary['retention'])) + '\n'
+    if summary['risk'] is not None:
+        blocks['risk'] = "<h2>流失风险评分</h2>\n" + _html_list(
+            _risk_lines(summary['risk'])) + '\n'
+    fields = {key: html.escape(value) for key, value in _metric_fields(summary).items()}
+    return HTML_TEMPLATE.substitute(
+        fields,
+        high=_html_table(summary['high_churn_segments']),
+        low=_html_table(summary['low_churn_segments']),
+        drivers=_html_list([_driver_line(d) for d in summary['drivers']], 'ol'),
+        recommendations=_html_list(summary['recommendations'], 'ol'),
+        **blocks)
+
+
+RENDERERS = {'text': render_text, 'json': render_json, 'html': render_html}
+
+
+def write_summary(summary, base, formats=('text', 'json')):
+    """按格式写出摘要文件 base + 扩展名，返回写出的路径列表。"""
+    paths = []
+    for fmt in formats:
+        path = base + SUMMARY_EXTENSIONS[fmt]
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(RENDERERS[fmt](summary))
+        paths.append(path)
+    return paths
+
+
+# ------------------------------
+# 命令行：由原始CSV（分块聚合）或已保存的立方体生成摘要
+# ------------------------------
+
+def cube_table(cube):
+    """立方体按各维度上卷，得到与 aggregate_dimensions 结构相同的聚合表。
+
+    分箱维度的取值是分箱下边界，结果在 attrs['banded'] 中标记，摘要据此不推断最大值。
+    """
+    parts = []
+    for dim in cube.dimensions:
+        stats = cube.query(by=dim)[['count', 'churn']]
+        stats.index = pd.MultiIndex.from_product([[dim], stats.index.tolist()],
+                                                 names=['dimension', 'value'])
+        parts.append(stats)
+    table = pd.concat(parts)
+    table.attrs['banded'] = True
+    return table
+
+
+def summarize_csv(path, chunksize=None, validator=None):
+    """分块读取并校验原始CSV，一次遍历得到聚合表、立方体与留存曲线后生成摘要。
+
+    validator 为 None 时新建一个（只剔除问题行，不写隔离文件）；违规统计累计在其中。
+    """
+    # streaming 在模块顶层导入 survival / importance，这里延迟导入与其他模块保持一致
+    from .streaming import DEFAULT_CHUNKSIZE
+    from .validate import Validator, iter_validated
+
+    validator = validator or Validator()
+    table = cube = retention = None
+    for chunk in iter_validated(path, chunksize or DEFAULT_CHUNKSIZE, validator):
+        table = merge_aggregates(table, aggregate_dimensions(chunk, ANALYSIS_DIMENSIONS))
+        part = SegmentCube.from_frame(chunk)
+        cube = part if cube is None else cube.merge(part)
+        curves = RetentionCurves.from_frame(chunk)
+        retention = curves if retention is None else retention.merge(curves)
+    if table is None:
+        raise ValueError(f"{path} 中没有通过校验的数据行")
+    return build_summary(table, cube, retention)
+
+
+def output_bases(paths, output_dir=None):
+    """各输入对应的输出路径前缀（不含 _summary 后缀与扩展名）。
+
+    默认写在输入文件旁边；指定 output_dir 时由输入相对于公共父目录的路径拼接命名，
+    立方体使用默认文件名时以所在目录命名（region_X/segment_cube.npz → region_X），
+    避免各分区目录下的同名文件写到同一个输出。两个输入映射到同一输出时抛出 ValueError。
+    """
+    if output_dir is None:
+        bases = [os.path.splitext(path)[0] for path in paths]
+    else:
+        named = []
+        for path in map(os.path.abspath, paths):
+            if os.path.basename(path) == CUBE_FILENAME:
+                named.append(os.path.dirname(path))
+            else:
+                named.append(os.path.splitext(path)[0])
+        root = os.path.commonpath([os.path.dirname(name) for name in named])
+        bases = [os.path.join(output_dir, os.path.relpath(name, root).replace(os.sep, '_'))
+                 for name in named]
+    owner = {}
+    for path, base in zip(paths, bases):
+        key = os.path.normcase(os.path.abspath(base))
+        if key in owner:
+            raise ValueError(f"{owner[key]} 与 {path} 会写到同一个摘要文件 {base}_summary.*")
+        owner[key] = path
+    return bases
+
+
+def main(argv=None):
+    from .streaming import print_validation
+    from .validate import Validator
+
+    parser = argparse.ArgumentParser(description="电信客户流失分析 - 分析摘要")
+    parser.add_argument('inputs', nargs='+', help="原始CSV或已保存的立方体(.npz)，可传入多个分区")
+    parser.add_argument('--formats', nargs='+', default=['text', 'json'], choices=SUMMARY_FORMATS)
+    parser.add_argument('--output-dir', default=None,
+                        help="输出目录（默认写在各输入文件旁边，文件名为 <输入名>_summary.*；"
+                             "指定时按输入的相对路径命名，例如 region_X_summary.*）")
+    parser.add_argument('--chunksize', type=int, default=None, help="读取CSV时每个分块的行数")
+    args = parser.parse_args(argv)
+
+    try:
+        bases = output_bases(args.inputs, args.output_dir)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+    for path, base in zip(args.inputs, bases):
+        if path.endswith('.npz'):
+            cube = SegmentCube.load(path)
+            summary = build_summary(cube_table(cube), cube)
+        else:
+            # 问题行写入 <输出名>_quarantine.csv，与摘要放在一起
+            quarantine_path = base + '_quarantine.csv'
+            validator = Validator(quarantine_path=quarantine_path)
+            try:
+                summary = summarize_csv(path, args.chunksize, validator)
+            finally:
+                validator.close()
+            print_validation(validator.report(), quarantine_path)
+        for out in write_summary(summary, base + '_summary', args.formats):
+            print(f"✅ 摘要已保存为: {out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+# ==============================
+# 在网时长留存曲线 - 向量化 Kaplan-Meier
+# ==============================
+#
+# 原来的 “Tenure vs Churn Rate” 曲线是 df.groupby('tenure')['Churn'].mean()，
+# 每个月的样本量差异很大，曲线噪声大，而且没有考虑删失：未流失的客户只是
+# “至少在网 tenure 个月”，并不代表之后不会流失。这里把在网时长（月）作为生存时间、
+# 流失作为事件，计算 Kaplan-Meier 留存曲线 S(t) = Π (1 - d_i / n_i)：
+#   - 整体与各分层（Contract / InternetService / PaymentMethod 的每个取值）的
+#     [删失数, 流失数] 按 (分层, 在网月数) 一次 np.bincount 计数（相当于计数排序）；
+#   - 风险集 n_i 为按在网月数倒序的累计离开数，所有分层在同一个数组上一次计算；
+#   - 置信区间使用 Greenwood 方差。
+# 计数是可加的，分块、分区或增量快照的结果可以直接 merge。
+#
+# 用法:
+#     python -m telecom_churn.survival WA_Fn-UseC_-Telco-Customer-Churn.csv --by Contract --months 1 3 6 12
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import _codes
+from .intervals import DEFAULT_LEVEL, _z_score
+
+RETENTION_STRATA = ['Contract', 'InternetService', 'PaymentMethod']
+# 报告中列出的留存率月份；第1-3个月为新客户留存监控指标
+RETENTION_MONTHS = (1, 2, 3, 6, 12, 24)
+KPI_MONTHS = (1, 2, 3)
+# 整体曲线在分层索引中的标签
+OVERALL = ('overall', 'all')
+
+
+def kaplan_meier(events, censored):
+    """按最后一维（在网月数）计算 Kaplan-Meier 曲线，可同时处理多条分层。
+
+    返回 (风险集人数, 留存率, Greenwood 标准误)，形状与输入相同。
+    """
+    events = np.asarray(events, dtype=np.float64)
+    exits = events + np.asarray(censored, dtype=np.float64)
+    at_risk = np.cumsum(exits[..., ::-1], axis=-1)[..., ::-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        hazard = np.where(at_risk > 0, events / at_risk, 0.0)
+        greenwood = np.where(at_risk > events, events / (at_risk * (at_risk - events)), 0.0)
+    survival = np.cumprod(1 - hazard, axis=-1)
+    se = survival * np.sqrt(np.cumsum(greenwood, axis=-1))
+    return at_risk, survival, se
+
+
+class RetentionCurves:
+    """整体与各分层的 (在网月数 × [删失数, 流失数]) 计数，以及由此得到的留存曲线。
+
+    events / censored 为 DataFrame：行索引为 (dimension, value)，列为在网月数 0..T。
+    """
+
+    def __init__(self, events, censored):
+        self.events = events
+        self.censored = censored
+
+    @classmethod
+    def from_frame(cls, df, strata=RETENTION_STRATA):
+        """一次遍历统计整体与所有分层在每个在网月数上的删失数与流失数。"""
+        tenure = np.clip(df['tenure'].to_numpy(dtype=np.int64), 0, None)
+        n_tenure = int(tenure.max()) + 1 if len(tenure) else 1
+        churn = df['Churn'].to_numpy().astype(np.int64)
+
+        # 每行在每个分层维度上的槽位；第 0 个槽位为整体
+        slots = [np.zeros(len(df), dtype=np.int64)]
+        index = [OVERALL]
+        offset = 1
+        for dim in strata:
+            codes, uniques = _codes(df[dim])
+            slots.append(np.where(codes >= 0, codes + offset, -1))
+            index.extend((dim, value) for value in uniques)
+            offset += len(uniques)
+        keys = np.stack(slots, axis=1)
+        # 缺失值统一放到末尾的哨兵槽位
+        keys[keys < 0] = offset
+        # 键 = (槽位 × 月数 + 在网月数) × 2 + 流失标记
+        keys = (keys * n_tenure + tenure[:, None]) * 2 + churn[:, None]
+        counts = np.bincount(keys.ravel(), minlength=2 * n_tenure * (offset + 1))
+        counts = counts[:2 * n_tenure * offset].reshape(offset, n_tenure, 2)
+
+        index = pd.MultiIndex.from_tuples(index, names=['dimension', 'value'])
+        observed = counts.sum(axis=(1, 2)) > 0
+        columns = pd.RangeIndex(n_tenure, name='tenure')
+        return cls(pd.DataFrame(counts[observed, :, 1], index=index[observed], columns=columns),
+                   pd.DataFrame(counts[observed, :, 0], index=index[observed], columns=columns))
+
+    def merge(self, other):
+        """合并另一份计数（分层或在网月数不同时按标签对齐，缺失视为0）。"""
+        def add(left, right):
+            total = left.add(right, fill_value=0).fillna(0).astype(np.int64)
+            total.columns.name = 'tenure'
+            return total
+        return RetentionCurves(add(self.events, other.events), add(self.censored, other.censored))
+
+    def strata(self, dimension=None):
+        """分层标签列表；指定 dimension 时只返回该维度的取值。"""
+        if dimension is None:
+            return list(self.events.index)
+        return [value for dim, value in self.events.index if dim == dimension]
+
+    def curve(self, dimension=OVERALL[0], value=OVERALL[1], level=DEFAULT_LEVEL):
+        """单条留存曲线，索引为在网月数，截止到最后一个仍有客户在风险集中的月份。"""
+        events = self.events.loc[(dimension, value)].to_numpy()
+        censored = self.censored.loc[(dimension, value)].to_numpy()
+        at_risk, survival, se = kaplan_meier(events, censored)
+        z = _z_score(level)
+        out = pd.DataFrame({'at_risk': at_risk.astype(np.int64), 'events': events,
+                            'censored': censored, 'survival': survival,
+                            'ci_low': np.clip(survival - z * se, 0, 1),
+                            'ci_high': np.clip(survival + z * se, 0, 1)},
+                           index=self.events.columns)
+        return out[at_risk > 0]
+
+    def curves(self, dimension, level=DEFAULT_LEVEL):
+        """某个分层维度所有取值的留存曲线 {取值: 曲线}。"""
+        return {value: self.curve(dimension, value, level) for value in self.strata(dimension)}
+
+    def retention(self, months=RETENTION_MONTHS, dimension=None):
+        """各分层在指定月份的留存率表（行为分层，列为月份）。
+
+        dimension 为 None 时包含整体与所有分层；超出分层最长观察时长的月份为 NaN。
+        """
+        at_risk, survival, _ = kaplan_meier(self.events.to_numpy(), self.censored.to_numpy())
+        months = list(months)
+        n_tenure = survival.shape[1]
+        table = np.full((len(survival), len(months)), np.nan)
+        for j, month in enumerate(months):
+            if month < n_tenure:
+                table[:, j] = np.where(at_risk[:, month] > 0, survival[:, month], np.nan)
+        out = pd.DataFrame(table, index=self.events.index, columns=months)
+        if dimension is not None:
+            out = out.xs(dimension, level='dimension')
+        return out
+
+    def new_customer_retention(self, months=KPI_MONTHS):
+        """监控指标：整体在第1-3个月的留存率 {月份: 留存率}。"""
+        row = self.retention(months).loc[OVERALL]
+        return {int(month): float(rate) for month, rate in row.items()}
+
+    def chart_data(self, strata=RETENTION_STRATA):
+        """retention_curves 图表输入：整体曲线与各分层维度的曲线。"""
+        return {'overall': self.curve(),
+                'strata': {dim: self.curves(dim) for dim in strata if self.strata(dim)}}
+
+
+def accumulate_retention(path, chunksize=None, strata=RETENTION_STRATA):
+    """分块读取CSV并合并各块的计数，返回 RetentionCurves。"""
+    # streaming 的累加器在模块顶层导入本模块，这里延迟导入避免循环引用
+    from .streaming import DEFAULT_CHUNKSIZE, iter_chunks
+
+    curves = None
+    for chunk in iter_chunks(path, chunksize or DEFAULT_CHUNKSIZE):
+        partial = RetentionCurves.from_frame(chunk, strata)
+        curves = partial if curves is None else curves.merge(partial)
+    return curves
+
+
+def format_retention(table):
+    """留存率表格式化为百分比文本。"""
+    return table.apply(lambda col: col.map(lambda v: '-' if np.isnan(v) else f'{v:.1%}'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="电信客户流失分析 - 在网时长留存曲线")
+    parser.add_argument('input', help="原始CSV路径")
+    parser.add_argument('--by', default=None, choices=RETENTION_STRATA,
+                        help="只输出该分层维度（默认输出整体与全部分层）")
+    parser.add_argument('--months', type=int, nargs='+', default=list(RETENTION_MONTHS),
+                        help="输出留存率的月份")
+    parser.add_argument('--chunksize', type=int, default=None, help="每个分块的行数（默认100000）")
+    args = parser.parse_args(argv)
+
+    curves = accumulate_retention(args.input, args.chunksize)
+    table = curves.retention(args.months, args.by)
+    table.columns = [f'{m}个月' for m in table.columns]
+    print("📈 Kaplan-Meier 留存率:")
+    print(format_retention(table).to_string())
+
+
+if __name__ == '__main__':
+    main()
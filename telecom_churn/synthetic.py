@@ -0,0 +1,105 @@
+# ==============================
+# 合成数据生成器 - 任意行数的 Telco 数据集
+# ==============================
+#
+# 以 Kaggle 原始数据为模板，按行有放回抽样，保留各列之间的联动关系
+# （无互联网服务 → 附加服务为 'No internet service'，无电话服务 → 'No phone service'，
+# 在网0个月 → TotalCharges 为空格），再对月费加入小幅扰动并按比例调整总费用，
+# 生成新的 customerID。各列的边际分布与原始数据一致，输出的 CSV 可直接被
+# 主脚本、分块流式模式和并行模式读取。
+#
+# 用法:
+#     python -m telecom_churn.synthetic synthetic_1m.csv --rows 1000000 --seed 0
+
+import argparse
+import os
+import string
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'WA_Fn-UseC_-Telco-Customer-Churn.csv')
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+# 月费扰动幅度（美元）与原始数据中的月费范围
+MONTHLY_JITTER = 1.0
+MONTHLY_RANGE = (18.25, 118.75)
+
+_LETTERS = np.array(list(string.ascii_uppercase))
+
+
+def load_template(path=DEFAULT_TEMPLATE):
+    """按原始字符串读取模板，保证输出与原始文件格式一致（包括空白 TotalCharges）。"""
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def customer_ids(start, n):
+    """生成唯一的 'NNNN-XXXXX' 格式编号：行号的低位编码为4位数字，高位编码为5个字母。"""
+    index = np.arange(start, start + n, dtype=np.int64)
+    digits = (index % 10_000).astype(str)
+    rest = index // 10_000
+    letters = []
+    for _ in range(5):
+        rest, code = np.divmod(rest, 26)
+        letters.append(_LETTERS[code])
+    suffix = np.char.add(np.char.add(np.char.add(letters[4], letters[3]),
+                                     np.char.add(letters[2], letters[1])), letters[0])
+    return np.char.add(np.char.add(np.char.zfill(digits, 4), '-'), suffix)
+
+
+def generate_chunk(template, n, rng, start=0):
+    """从模板抽样生成 n 行合成数据（字符串列，与原始CSV同结构）。"""
+    rows = rng.integers(0, len(template), size=n)
+    chunk = pd.DataFrame({col: template[col].to_numpy()[rows] for col in template.columns})
+    chunk['customerID'] = customer_ids(start, n)
+
+    monthly = chunk['MonthlyCharges'].astype(np.float64).to_numpy()
+    jittered = np.clip(monthly + rng.uniform(-MONTHLY_JITTER, MONTHLY_JITTER, size=n),
+                       *MONTHLY_RANGE)
+    jittered = np.round(jittered / 0.05) * 0.05
+    chunk['MonthlyCharges'] = np.char.mod('%.2f', jittered)
+
+    total = chunk['TotalCharges'].to_numpy()
+    filled = np.char.strip(total.astype(str)) != ''
+    scaled = pd.to_numeric(pd.Series(total[filled]), errors='coerce').to_numpy() \
+        * (jittered[filled] / monthly[filled])
+    total = total.astype(object)
+    total[filled] = np.char.mod('%.2f', np.round(scaled, 2))
+    chunk['TotalCharges'] = total
+    return chunk
+
+
+def write_synthetic_csv(path, n_rows, seed=None, template=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """分块生成并写出 n_rows 行合成数据，内存占用只与 chunk_rows 有关。"""
+    template = load_template() if template is None else template
+    rng = np.random.default_rng(seed)
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(','.join(template.columns) + '\n')
+        while written < n_rows:
+            n = min(chunk_rows, n_rows - written)
+            chunk = generate_chunk(template, n, rng, start=written)
+            # 所有取值都是不含逗号和引号的字符串，直接拼接成行，比 to_csv 快数倍
+            columns = (chunk[col].to_numpy() for col in template.columns)
+            f.write('\n'.join(map(','.join, zip(*columns))) + '\n')
+            written += n
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="电信客户流失分析 - 合成数据生成")
+    parser.add_argument('path', help="输出CSV路径")
+    parser.add_argument('--rows', type=int, required=True, help="生成的行数")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--template', default=DEFAULT_TEMPLATE, help="作为分布模板的原始CSV")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    write_synthetic_csv(args.path, args.rows, args.seed, load_template(args.template),
+                        args.chunk_rows)
+    print(f"✅ 已生成 {args.rows:,} 行合成数据: {args.path}")
+
+
+if __name__ == '__main__':
+    main()